@@ -0,0 +1,29 @@
+"""
+JSON encoding/decoding helpers.
+
+Uses orjson when it is installed and falls back to the standard library otherwise.
+Both paths work on bytes so callers can read and write files in binary mode.
+"""
+import json
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+JSONDecodeError = json.JSONDecodeError
+
+try:
+    import orjson
+
+    def loads(data):
+        """Parses a JSON document from bytes or str."""
+        return orjson.loads(data)
+
+    def dumps(obj):
+        """Serializes obj to UTF-8 JSON bytes, indented with two spaces."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def loads(data):
+        """Parses a JSON document from bytes or str."""
+        return json.loads(data)
+
+    def dumps(obj):
+        """Serializes obj to UTF-8 JSON bytes, indented with two spaces."""
+        return json.dumps(obj, indent=2).encode('utf-8')
@@ -3,17 +3,19 @@ Main CLI entry point for MCPM.
 """
 import click
 
+from mcpm.log import set_quiet
 from mcpm.commands.list import list_items
-from mcpm.commands.install import install_command_func
+from mcpm.commands.install import install_command_func, install_packages_command_func
 from mcpm.commands.uninstall import uninstall_command_func
 from mcpm.commands.configure import configure_command_func
 from mcpm.commands.create import create
 from mcpm.commands.publish import publish
 
 @click.group()
-def cli():
+@click.option("--quiet", "-q", is_flag=True, help="Suppress configuration status messages")
+def cli(quiet):
     """Model Context Protocol Manager (MCPM)"""
-    pass
+    set_quiet(quiet)
 
 @cli.command("list")
 @click.option("--non-interactive", is_flag=True, help="Run in non-interactive mode")
@@ -25,9 +27,14 @@ def list_command(non_interactive, search):
 @cli.command("create")
 @click.option("--output", "-o", help="Output filename for the package zip")
 @click.option("--source", "-s", default=".", help="Source directory to package")
-def create_command(output, source):
+@click.option("--compress-level", type=click.IntRange(0, 9), default=1, show_default=True,
+              help="Deflate compression level (0 = fastest, 9 = smallest)")
+@click.option("--compress-method", type=click.Choice(["deflate", "stored"]), default="deflate", show_default=True,
+              help="How package members are stored (stored = no compression, fastest)")
+@click.option("--verbose", "-v", is_flag=True, help="List every file added to or excluded from the package")
+def create_command(output, source, compress_level, compress_method, verbose):
     """Create an MCP server package (zip) from the current directory."""
-    create(output, source)
+    create(output, source, compress_level, verbose, compress_method)
 
 @cli.command("publish")
 @click.argument("package_file")
@@ -36,11 +43,15 @@ def publish_command(package_file):
     publish(package_file)
 
 @cli.command("install")
-@click.argument("package_name")
+@click.argument("package_names", nargs=-1, required=True)
 @click.option("--target", "-t", help="Target tool to configure (e.g., 'windsurf')")
-def install_command(package_name, target):
-    """Installs a package or configures a server."""
-    install_command_func(package_name, target)
+def install_command(package_names, target):
+    """Installs packages or configures servers."""
+    if target or len(package_names) == 1:
+        for package_name in package_names:
+            install_command_func(package_name, target)
+    else:
+        install_packages_command_func(package_names)
 
 @cli.command("uninstall")
 @click.argument("package_name")
@@ -52,7 +63,7 @@ def uninstall_command(package_name, target):
 @cli.command("configure")
 @click.option("--package-name", "-p", help="Name of the package to configure")
 @click.option("--target-ide", "-t", help="Target IDE to configure for (e.g., 'windsurf')")
-@click.option("--action", "-a", type=click.Choice(["add", "remove"]), help="Action to perform")
+@click.option("--action", "-a", type=click.Choice(["add", "remove"], case_sensitive=False), help="Action to perform")
 @click.option("--non-interactive", is_flag=True, help="Run in non-interactive mode")
 def configure_command(package_name, target_ide, action, non_interactive):
     """Configures an installed MCP package for a target IDE."""
@@ -2,13 +2,13 @@
 Configure command implementation for MCPM.
 """
 import click
-import json
-import questionary
 from pathlib import Path
 
-from mcpm.config.manager import get_target_config_path, update_mcp_config_file_for_configure, remove_server_from_mcp_config
-from mcpm.database.local_db import init_local_db, get_all_installed_package_details, get_package_input_values
+from mcpm import _json
+from mcpm.config.manager import get_target_config_path, dispatch_config_action
+from mcpm.database.local_db import get_all_installed_package_details, get_installed_packages_by_names, get_package_input_values
 from mcpm.utils.ui_helpers import _configure_specific_package
+from mcpm.utils.package_helpers import load_package_metadata
 
 def configure_command_func(package_name=None, target_ide=None, action=None, non_interactive=False):
     """
@@ -20,27 +20,22 @@ def configure_command_func(package_name=None, target_ide=None, action=None, non_
         action: Action to perform ('add' or 'remove').
         non_interactive: Whether to run in non-interactive mode.
     """
-    # Initialize the local database
-    init_local_db()
-    
-    # Get installed packages
-    installed_packages = get_all_installed_package_details()
-    
-    if not installed_packages:
-        click.echo("No packages are installed. Please install a package first.")
-        return
-    
-    # If package_name is provided, find its details
+    # If package_name is provided, look up just that package
     package_path = None
     if package_name:
-        for pkg in installed_packages:
-            if pkg["name"] == package_name:
-                package_path = pkg["install_path"]
-                break
+        package_info = get_installed_packages_by_names([package_name]).get(package_name)
+        package_path = package_info["install_path"] if package_info else None
         
         if not package_path:
             click.echo(f"Error: Package '{package_name}' is not installed.", err=True)
             return
+    else:
+        # Get installed packages
+        installed_packages = get_all_installed_package_details()
+        
+        if not installed_packages:
+            click.echo("No packages are installed. Please install a package first.")
+            return
     
     # Non-interactive mode
     if non_interactive:
@@ -57,6 +52,8 @@ def configure_command_func(package_name=None, target_ide=None, action=None, non_
         # If package_name is provided, configure that specific package
         _configure_specific_package(package_name, package_path)
     else:
+        import questionary
+        
         # Let user select a package to configure
         pkg_choices = []
         for pkg in installed_packages:
@@ -68,13 +65,11 @@ def configure_command_func(package_name=None, target_ide=None, action=None, non_
             mcp_package_json_path = Path(pkg_path) / "mcp_package.json"
             has_ide_configs = False
             
-            if mcp_package_json_path.exists():
-                try:
-                    with open(mcp_package_json_path, 'r') as f:
-                        metadata = json.load(f)
-                    has_ide_configs = 'ide_config_commands' in metadata and metadata['ide_config_commands']
-                except:
-                    pass
+            try:
+                metadata = load_package_metadata(mcp_package_json_path)
+                has_ide_configs = 'ide_config_commands' in metadata and metadata['ide_config_commands']
+            except:
+                pass  # Missing or unreadable metadata
             
             # Only add packages that have IDE configurations
             if has_ide_configs:
@@ -121,14 +116,12 @@ def _process_configuration(package_name, package_path, target_ide, action):
     pkg_install_path = Path(package_path)
     mcp_package_json_path = pkg_install_path / "mcp_package.json"
     
-    if not mcp_package_json_path.exists():
+    try:
+        package_metadata = load_package_metadata(mcp_package_json_path)
+    except FileNotFoundError:
         click.echo(f"Error: mcp_package.json not found at {mcp_package_json_path}.", err=True)
         return
-    
-    try:
-        with open(mcp_package_json_path, 'r') as f:
-            package_metadata = json.load(f)
-    except json.JSONDecodeError:
+    except _json.JSONDecodeError:
         click.echo(f"Error: Could not parse {mcp_package_json_path}.", err=True)
         return
     except IOError as e:
@@ -157,17 +150,4 @@ def _process_configuration(package_name, package_path, target_ide, action):
     input_values = get_package_input_values(install_name)
     
     # Process the action
-    if action == "add":
-        # Update the configuration
-        if update_mcp_config_file_for_configure(config_path, install_name, ide_config, pkg_install_path, input_values):
-            click.echo(f"Successfully configured {package_name} for {target_ide}.")
-        else:
-            click.echo(f"Failed to configure {package_name} for {target_ide}.", err=True)
-    elif action == "remove":
-        # Remove the configuration
-        if remove_server_from_mcp_config(config_path, install_name):
-            click.echo(f"Successfully removed {package_name} configuration from {target_ide}.")
-        else:
-            click.echo(f"Failed to remove {package_name} configuration from {target_ide}.", err=True)
-    else:
-        click.echo(f"Error: Unknown action '{action}'. Must be 'add' or 'remove'.", err=True)
+    dispatch_config_action(action, package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values)
@@ -2,23 +2,37 @@
 Create command implementation for MCPM.
 """
 import click
-import json
 import os
+import zipfile
 from pathlib import Path
 
-from mcpm.utils.package_helpers import create_package_archive
+from mcpm import _json
+from mcpm.utils.package_helpers import create_package_archive, validate_package_metadata
 
-def create(output, source):
+# --compress-method choices mapped to zipfile compression constants
+_COMPRESSION_METHODS = {
+    "deflate": zipfile.ZIP_DEFLATED,
+    "stored": zipfile.ZIP_STORED,
+}
+
+def _normalize_package_name(package_name):
+    """Normalizes a package name: lowercase, with spaces replaced by dashes."""
+    return package_name.lower().replace(" ", "-")
+
+def create(output, source, compress_level=1, verbose=False, compress_method="deflate"):
     """
     Create an MCP server package (zip) from the current directory.
     
     Args:
         output: Output filename for the package zip.
         source: Source directory to package.
+        compress_level: Deflate compression level (0-9) for the archive.
+        verbose: List every file added to or excluded from the archive.
+        compress_method: "deflate" or "stored" (no compression).
     """
     # Validate source directory
     source_path = Path(source).resolve()
-    if not source_path.exists() or not source_path.is_dir():
+    if not source_path.is_dir():  # False for missing paths too
         click.echo(f"Error: Source directory '{source}' does not exist or is not a directory.", err=True)
         return
     
@@ -33,8 +47,7 @@ def create(output, source):
             package_author = click.prompt("Author", default="")
             package_license = click.prompt("License", default="MIT")
             
-            # Normalize package name: lowercase and replace spaces with dashes
-            normalized_name = package_name.lower().replace(" ", "-")
+            normalized_name = _normalize_package_name(package_name)
             
             # Create a basic metadata file
             metadata = {
@@ -101,8 +114,8 @@ def create(output, source):
             
             # Write the metadata file
             try:
-                with open(metadata_path, 'w') as f:
-                    json.dump(metadata, f, indent=2)
+                with open(metadata_path, 'wb') as f:
+                    f.write(_json.dumps(metadata))
                 click.echo(f"Created {metadata_path}")
             except Exception as e:
                 click.echo(f"Error creating metadata file: {e}", err=True)
@@ -113,38 +126,37 @@ def create(output, source):
     else:
         # Validate existing mcp_package.json
         try:
-            with open(metadata_path, 'r') as f:
-                metadata = json.load(f)
+            with open(metadata_path, 'rb') as f:
+                metadata = _json.loads(f.read())
             
-            # Check for required fields
-            required_fields = ["name", "version"]
-            missing_fields = [field for field in required_fields if field not in metadata]
-            
-            if missing_fields:
-                click.echo(f"Error: mcp_package.json is missing required fields: {', '.join(missing_fields)}", err=True)
+            # Check for required fields and well-formed steps
+            metadata_error = validate_package_metadata(metadata)
+            if metadata_error:
+                click.echo(f"Error: {metadata_error}", err=True)
                 return
-        except json.JSONDecodeError:
+        except _json.JSONDecodeError:
             click.echo("Error: mcp_package.json is not valid JSON.", err=True)
             return
         except Exception as e:
             click.echo(f"Error reading mcp_package.json: {e}", err=True)
             return
     
+    package_name = _normalize_package_name(metadata.get("name", source_path.name))
+    
     # Set default output filename if not provided
     if not output:
-        package_name = metadata.get("name", source_path.name)
-        # Normalize package name: lowercase and replace spaces with dashes
-        package_name = package_name.lower().replace(" ", "-")
         package_version = metadata.get("version", "0.1.0")
         output = f"{package_name}-{package_version}.mcpz"
     
     # Create the package archive
-    if create_package_archive(output, source):
-        click.echo(f"Package created: {output}")
-        
-        # Show next steps
-        click.echo("\nNext steps:")
-        click.echo(f"1. Publish your package: mcpm publish {output}")
-        click.echo(f"2. Install your package: mcpm install {package_name}")
+    if create_package_archive(output, source, compresslevel=compress_level, verbose=verbose,
+                              compression=_COMPRESSION_METHODS[compress_method]):
+        # Report the package and next steps in one write
+        click.echo(
+            f"Package created: {output}\n"
+            "\nNext steps:\n"
+            f"1. Publish your package: mcpm publish {output}\n"
+            f"2. Install your package: mcpm install {package_name}"
+        )
     else:
         click.echo("Failed to create package.", err=True)
@@ -5,10 +5,10 @@ import click
 import json
 from pathlib import Path
 
-from mcpm.registry.api import get_registry_server, download_package
+from mcpm.registry.api import get_registry_server, download_package, download_packages
 from mcpm.utils.package_helpers import install_package_from_zip
 from mcpm.config.manager import get_target_config_path, update_mcp_config_file
-from mcpm.database.local_db import init_local_db
+from mcpm.database.local_db import add_packages_to_local_db
 
 def install_command_func(package_name, target):
     """
@@ -18,9 +18,6 @@ def install_command_func(package_name, target):
         package_name: Name of the package to install.
         target: Target tool to configure (e.g., 'windsurf').
     """
-    # Initialize the local database
-    init_local_db()
-    
     # Check if this is a server configuration request
     if target:
         # This is a server configuration request
@@ -46,7 +43,7 @@ def install_command_func(package_name, target):
         
         # Update the target configuration file
         if update_mcp_config_file(config_path, package_name, config_command):
-            click.echo(f"Successfully configured server '{package_name}' for {target}.")
+            click.echo(f"Successfully configured server '{package_name}' for {target} at {config_path}.")
         else:
             click.echo(f"Failed to configure server '{package_name}' for {target}.", err=True)
     else:
@@ -54,14 +51,51 @@ def install_command_func(package_name, target):
         click.echo(f"Installing package {package_name}...")
         
         # Download the package
-        zip_path = download_package(package_name)
-        if not zip_path:
+        package_file = download_package(package_name)
+        if not package_file:
             click.echo(f"Error: Failed to download package {package_name}.", err=True)
             return
         
         # Install the package
-        success, _ = install_package_from_zip(zip_path, package_name)
+        success, _ = install_package_from_zip(package_file, package_name)
         if success:
             click.echo(f"Successfully installed package {package_name}.")
         else:
             click.echo(f"Failed to install package {package_name}.", err=True)
+
+def install_packages_command_func(package_names):
+    """
+    Installs several packages, downloading them concurrently first.
+    
+    Installation itself stays sequential because install inputs and install steps
+    prompt the user.
+    
+    Args:
+        package_names: Names of the packages to install.
+    """
+    click.echo(f"Installing packages {', '.join(package_names)}...")
+    package_files = download_packages(package_names)
+    
+    failed = []
+    # Rows for the installed_packages table, recorded in one transaction at the end
+    installed_rows = []
+    try:
+        for package_name, package_file in package_files.items():
+            if not package_file:
+                click.echo(f"Error: Failed to download package {package_name}.", err=True)
+                failed.append(package_name)
+                continue
+            
+            success, _ = install_package_from_zip(package_file, package_name, pending_db_rows=installed_rows)
+            if success:
+                click.echo(f"Successfully installed package {package_name}.")
+            else:
+                click.echo(f"Failed to install package {package_name}.", err=True)
+                failed.append(package_name)
+    finally:
+        # Record the packages installed so far even if a later one raised or the user
+        # aborted one of its prompts, so they stay visible to list and uninstall
+        add_packages_to_local_db(installed_rows)
+    
+    if failed:
+        click.echo(f"Failed to install: {', '.join(failed)}", err=True)
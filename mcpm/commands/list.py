@@ -2,32 +2,57 @@
 List command implementation for MCPM.
 """
 import click
-import questionary
 import json
 from pathlib import Path
 
-from mcpm.registry.api import get_registry_packages, get_registry_servers
-from mcpm.database.local_db import init_local_db, get_all_installed_package_details
+from mcpm.registry.api import get_registry_listings
+from mcpm.database.local_db import get_installed_packages_by_name
 from mcpm.utils.ui_helpers import _display_package_details_interactive
 from mcpm.utils.package_helpers import _get_package_data_by_name
 
+# Values of the informational (disabled) choices in the interactive list
+_INFO_CHOICE_VALUES = frozenset({"no_packages", "no_results", "no_local_results", "local_header"})
+
+def _registry_package_title(pkg, installed_packages_info):
+    """Builds the interactive list title for a registry package: status, name, version, description, author."""
+    pkg_name = pkg.get("name", "Unknown Package Name")
+    pkg_version = pkg.get("version", "N/A")
+    pkg_description = pkg.get("description", "")
+    pkg_author = pkg.get("author", "")
+    
+    # Use installed version if available
+    installed = installed_packages_info.get(pkg_name)
+    display_version = installed.get('version', pkg_version) if installed else pkg_version
+    status_icon = "✅" if installed else "  "
+    
+    # Format title with name, version, status, then description
+    title_parts = [f"{status_icon} {pkg_name} (v{display_version})"]
+    
+    # Add truncated description if available
+    if pkg_description:
+        max_desc_len = 80
+        desc_display = pkg_description[:max_desc_len] + ('...' if len(pkg_description) > max_desc_len else '')
+        title_parts.append(f"- {desc_display}")
+    
+    # Add author if available
+    if pkg_author and pkg_author.strip():
+        title_parts.append(f"(by {pkg_author})")
+    
+    return " ".join(title_parts)
+
 def list_items(non_interactive, search=None):
     """
     Fetches and lists packages and servers from the registry.
     In interactive mode (default), shows package details and allows management.
     """
-    # Initialize the local database
-    init_local_db()
-    
     # Get installed packages info
-    installed_packages = get_all_installed_package_details()
-    installed_packages_info = {pkg["name"]: pkg for pkg in installed_packages}
+    installed_packages_info = get_installed_packages_by_name()
     
-    # Fetch packages from registry
-    all_packages_data = get_registry_packages()
+    # Fetch packages and servers from the registry in parallel
+    all_packages_data, servers_data = get_registry_listings()
     
-    # Fetch servers from registry
-    servers_data = get_registry_servers()
+    # Registry package names, for telling local-only packages apart in O(1) per package
+    registry_package_names = {p.get("name") for p in (all_packages_data or [])}
     
     if non_interactive:
         # Non-interactive mode: just list packages and servers
@@ -70,7 +95,7 @@ def list_items(non_interactive, search=None):
             click.echo("No MCP packages found in the registry or registry is unavailable.")
         
         # List local-only packages
-        local_only_packages = [pkg for pkg in installed_packages if pkg["name"] not in [p.get("name") for p in (all_packages_data or [])]]
+        local_only_packages = [pkg for pkg in installed_packages_info.values() if pkg["name"] not in registry_package_names]
         if local_only_packages:
             click.echo("\n📁 Local-only Packages (not in registry)")
             for pkg in local_only_packages:
@@ -107,6 +132,7 @@ def list_items(non_interactive, search=None):
         return
     
     # Interactive mode
+    import questionary
     while True:
         click.clear()
         click.echo("🔧 MCP Package Manager")
@@ -136,39 +162,10 @@ def list_items(non_interactive, search=None):
                 ]
             
             # Add filtered packages to choices
-            for pkg in filtered_packages:
-                pkg_name = pkg.get("name", "Unknown Package Name")
-                pkg_version = pkg.get("version", "N/A")
-                pkg_description = pkg.get("description", "")
-                pkg_author = pkg.get("author", "")
-                
-                # Check if installed
-                is_installed = pkg_name in installed_packages_info
-                
-                # Use installed version if available
-                display_version = installed_packages_info[pkg_name].get('version', pkg_version) if is_installed else pkg_version
-                
-                # Build title parts with name, version, then status
-                status_icon = "✅" if is_installed else "  "
-                
-                # Format title with name, version, status, then description
-                title_parts = [
-                    f"{status_icon} {pkg_name} (v{display_version})"
-                ]
-                
-                # Add truncated description if available
-                if pkg_description:
-                    max_desc_len = 80
-                    desc_display = pkg_description[:max_desc_len] + ('...' if len(pkg_description) > max_desc_len else '')
-                    title_parts.append(f"- {desc_display}")
-                
-                # Add author if available
-                if pkg_author and pkg_author.strip():
-                    title_parts.append(f"(by {pkg_author})")
-                
-                # Join all parts, filtering out empty strings
-                title = " ".join(filter(None, title_parts))
-                choices.append(questionary.Choice(title=title, value=pkg_name))
+            choices.extend([
+                questionary.Choice(title=_registry_package_title(pkg, installed_packages_info), value=pkg.get("name", "Unknown Package Name"))
+                for pkg in filtered_packages
+            ])
             
             # Show "no results" message if search returned no packages
             if search and not filtered_packages:
@@ -177,7 +174,7 @@ def list_items(non_interactive, search=None):
             choices.append(questionary.Choice(title="No packages found in registry", value="no_packages", disabled=True))
         
         # Add local-only packages
-        local_only_packages = [pkg for pkg in installed_packages if pkg["name"] not in [p.get("name") for p in (all_packages_data or [])]]
+        local_only_packages = [pkg for pkg in installed_packages_info.values() if pkg["name"] not in registry_package_names]
         if local_only_packages:
             choices.append(questionary.Choice(title="📁 Local-only Packages", value="local_header", disabled=True))
             
@@ -190,23 +187,14 @@ def list_items(non_interactive, search=None):
                     if search_lower in pkg["name"].lower()
                 ]
             
-            # Add filtered local packages to choices
-            for pkg_dict in filtered_local_packages:
-                pkg_name = pkg_dict.get('name', 'N/A')
-                pkg_version = pkg_dict.get('version', 'N/A')
-                pkg_path = pkg_dict.get('install_path', 'N/A')
-                
-                # Format title with name, version, status, then details
-                title_parts = [
-                    f"✅ {pkg_name} (v{pkg_version})",
-                    "[Local only]"
-                ]
-                
-                # No author information for local-only packages
-                
-                # Join all parts, filtering out empty strings
-                title = " ".join(filter(None, title_parts))
-                choices.append(questionary.Choice(title=title, value=pkg_name))
+            # Add filtered local packages to choices (no author information for local-only packages)
+            choices.extend([
+                questionary.Choice(
+                    title=f"✅ {pkg_dict.get('name', 'N/A')} (v{pkg_dict.get('version', 'N/A')}) [Local only]",
+                    value=pkg_dict.get('name', 'N/A')
+                )
+                for pkg_dict in filtered_local_packages
+            ])
             
             # Show search results for local packages if search was performed
             if search and not filtered_local_packages and local_only_packages:
@@ -241,7 +229,7 @@ def list_items(non_interactive, search=None):
             # Exit the application
             return
         
-        if selection in ["no_packages", "no_results", "no_local_results", "local_header"]:
+        if selection in _INFO_CHOICE_VALUES:
             # These are just informational headers, not selectable items
             continue
         
@@ -253,8 +241,7 @@ def list_items(non_interactive, search=None):
             return
         elif result == "state_changed":
             # Refresh installed packages info
-            installed_packages = get_all_installed_package_details()
-            installed_packages_info = {pkg["name"]: pkg for pkg in installed_packages}
+            installed_packages_info = get_installed_packages_by_name()
         elif result == "back_to_list":
             # Just continue the loop
             pass
@@ -1,13 +1,69 @@
 """
 Publish command implementation for MCPM.
 """
+import io
+import os
+import uuid
 import click
-import requests
 import json
 import zipfile
 from pathlib import Path
 
-from mcpm.registry.api import get_registry_url
+from mcpm import _json
+from mcpm.utils.package_helpers import validate_package_metadata
+from mcpm.registry.api import get_registry_url, invalidate_registry_cache, get_session
+
+class _MultipartFormStream:
+    """
+    A streaming multipart/form-data request body.
+    
+    requests builds multipart bodies from `files=` entirely in memory; this object
+    instead emits the form parts piecewise from read(), so package files are sent
+    straight from disk. __len__ lets requests send a Content-Length header.
+    """
+
+    def __init__(self, fields, files):
+        """
+        Args:
+            fields: Dict of form field names to string values (sent first).
+            files: Dict of form field names to (filename, binary file object) tuples.
+        """
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        parts = []
+        for name, value in fields.items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode('utf-8'))
+            parts.append(value.encode('utf-8'))
+            parts.append(b"\r\n")
+        for name, (filename, fileobj) in files.items():
+            filename = filename.replace('"', '%22')
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n\r\n'.encode('utf-8'))
+            parts.append(fileobj)
+            parts.append(b"\r\n")
+        parts.append(f"--{boundary}--\r\n".encode('utf-8'))
+        
+        self._length = sum(
+            len(part) if isinstance(part, bytes) else os.fstat(part.fileno()).st_size - part.tell()
+            for part in parts
+        )
+        self._parts = iter([io.BytesIO(part) if isinstance(part, bytes) else part for part in parts])
+        self._current = next(self._parts)
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """Reads up to size bytes of the encoded body (everything that is left if size < 0)."""
+        chunks = []
+        while self._current is not None and size != 0:
+            chunk = self._current.read(size)
+            if not chunk:
+                self._current = next(self._parts, None)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
 
 def publish(package_file):
     """
@@ -24,21 +80,20 @@ def publish(package_file):
     # Validate the package file
     try:
         with zipfile.ZipFile(package_path, 'r') as zip_ref:
-            # Check for mcp_package.json
-            if "mcp_package.json" not in zip_ref.namelist():
+            # Check for mcp_package.json (getinfo is a dict lookup, namelist() builds a list)
+            try:
+                metadata_info = zip_ref.getinfo("mcp_package.json")
+            except KeyError:
                 click.echo("Error: Package does not contain mcp_package.json.", err=True)
                 return
             
             # Read the metadata
-            with zip_ref.open("mcp_package.json") as f:
-                metadata = json.loads(f.read().decode('utf-8'))
+            metadata = _json.loads(zip_ref.read(metadata_info))
             
-            # Check for required fields
-            required_fields = ["name", "version"]
-            missing_fields = [field for field in required_fields if field not in metadata]
-            
-            if missing_fields:
-                click.echo(f"Error: mcp_package.json is missing required fields: {', '.join(missing_fields)}", err=True)
+            # Check for required fields and well-formed steps (same rules as create)
+            metadata_error = validate_package_metadata(metadata)
+            if metadata_error:
+                click.echo(f"Error: {metadata_error}", err=True)
                 return
             
             package_name = metadata["name"]
@@ -46,7 +101,7 @@ def publish(package_file):
     except zipfile.BadZipFile:
         click.echo(f"Error: '{package_file}' is not a valid zip file.", err=True)
         return
-    except json.JSONDecodeError:
+    except _json.JSONDecodeError:
         click.echo("Error: mcp_package.json is not valid JSON.", err=True)
         return
     except Exception as e:
@@ -66,6 +121,8 @@ def publish(package_file):
     click.echo(f"Using registry URL: {registry_url}")
     click.echo(f"Publishing to: {upload_url}")
     
+    import requests
+    
     try:
         with open(package_path, 'rb') as f:
             # Use the 'package' field name as expected by the server
@@ -87,11 +144,14 @@ def publish(package_file):
                 'metadata': json.dumps(metadata_obj)
             }
             
-            # Make the request
-            response = requests.post(upload_url, files=files, data=data)
+            # Make the request, streaming the package from disk
+            body = _MultipartFormStream(data, files)
+            response = get_session().post(upload_url, data=body, headers={'Content-Type': body.content_type})
             
             if response.status_code == 200 or response.status_code == 201:
                 click.echo(f"Successfully published {package_name} (v{package_version}) to registry.")
+                # The registry listings changed; don't serve stale cached copies
+                invalidate_registry_cache()
             else:
                 click.echo(f"Error publishing package: {response.text}", err=True)
     except requests.exceptions.RequestException as e:
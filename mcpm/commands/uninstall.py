@@ -2,14 +2,12 @@
 Uninstall command implementation for MCPM.
 """
 import click
-import json
-import shutil
-import os
 from pathlib import Path
 
 from mcpm.config.constants import INSTALL_DIR
-from mcpm.config.manager import get_target_config_path, remove_server_from_mcp_config
-from mcpm.database.local_db import init_local_db, get_all_installed_package_details, remove_package_from_local_db
+from mcpm.config.manager import get_target_config_path, remove_server_from_mcp_config, apply_mcp_config_ops, read_config_file
+from mcpm.database.local_db import get_installed_packages_by_names, remove_package_from_local_db
+from mcpm.utils.package_helpers import load_package_metadata, invalidate_package_metadata_cache, remove_package_directory, run_step_command
 
 def uninstall_command_func(package_name, target):
     """
@@ -19,9 +17,6 @@ def uninstall_command_func(package_name, target):
         package_name: Name of the package to uninstall.
         target: Target tool to de-configure (e.g., 'windsurf').
     """
-    # Initialize the local database
-    init_local_db()
-    
     # Check if this is a server de-configuration request
     if target:
         # This is a server de-configuration request
@@ -35,7 +30,7 @@ def uninstall_command_func(package_name, target):
         
         # Remove the server from the target configuration file
         if remove_server_from_mcp_config(config_path, package_name):
-            click.echo(f"Successfully de-configured server '{package_name}' from {target}.")
+            click.echo(f"Successfully de-configured server '{package_name}' from {target} at {config_path}.")
         else:
             click.echo(f"Failed to de-configure server '{package_name}' from {target}.", err=True)
     else:
@@ -43,14 +38,12 @@ def uninstall_command_func(package_name, target):
         click.echo(f"Uninstalling package {package_name}...")
         
         # Get installed package details
-        installed_packages = get_all_installed_package_details()
-        installed_packages_dict = {pkg["name"]: pkg for pkg in installed_packages}
+        package_info = get_installed_packages_by_names([package_name]).get(package_name)
         
-        if package_name not in installed_packages_dict:
+        if not package_info:
             click.echo(f"Error: Package '{package_name}' is not installed.", err=True)
             return
         
-        package_info = installed_packages_dict[package_name]
         install_path = package_info.get("install_path")
         
         if not install_path:
@@ -64,51 +57,45 @@ def uninstall_command_func(package_name, target):
         # Variables for configuration removal
         config_key_name = package_name  # Default to package_name
         
-        if metadata_path.exists():
-            try:
-                with open(metadata_path, "r") as f:
-                    metadata = json.load(f)
-                
-                # Get the install_name from metadata (for config removal)
-                config_key_name = metadata.get("install_name", package_name)
-                
-                # Run uninstall steps if defined
-                uninstall_steps = metadata.get("uninstall_steps", [])
-                if uninstall_steps:
-                    click.echo(f"Running uninstall steps for {package_name}...")
-                    original_cwd = os.getcwd()
-                    try:
-                        os.chdir(pkg_path)
-                        click.echo(f"Changed directory to {pkg_path} for uninstall steps.")
-                        for idx, step in enumerate(uninstall_steps, 1):
-                            if step.get("type") == "shell" and "command" in step:
-                                command = step["command"]
-                                click.echo(f"Step {idx}: {command}")
-                                if click.confirm(f"Do you want to run this command in {os.getcwd()}?", default=True):
-                                    import subprocess
-                                    process_result = subprocess.run(command, shell=True, capture_output=True, text=True)
-                                    if process_result.stdout:
-                                        click.echo(f"Output:\n{process_result.stdout.strip()}")
-                                    if process_result.stderr:
-                                        click.echo(f"Error output:\n{process_result.stderr.strip()}", err=True)
-                                    if process_result.returncode != 0:
-                                        click.echo(f"Warning: Command '{command}' exited with code {process_result.returncode}", err=True)
-                                else:
-                                    click.echo("Skipped this step.")
+        try:
+            metadata = load_package_metadata(metadata_path)
+            
+            # Get the install_name from metadata (for config removal)
+            config_key_name = metadata.get("install_name", package_name)
+            
+            # Run uninstall steps if defined
+            uninstall_steps = metadata.get("uninstall_steps", [])
+            if uninstall_steps:
+                click.echo(f"Running uninstall steps for {package_name}...")
+                try:
+                    for idx, step in enumerate(uninstall_steps, 1):
+                        if step.get("type") == "shell" and "command" in step:
+                            command = step["command"]
+                            click.echo(f"Step {idx}: {command}")
+                            if click.confirm(f"Do you want to run this command in {pkg_path}?", default=True):
+                                # Output goes straight to the terminal as it is produced instead of being buffered
+                                process_result = run_step_command(command, pkg_path, capture=False)
+                                if process_result.returncode != 0:
+                                    click.echo(f"Warning: Command '{command}' exited with code {process_result.returncode}", err=True)
                             else:
-                                click.echo(f"Unknown or unsupported step type: {step}", err=True)
-                    except Exception as e:
-                        click.echo(f"Error running uninstall steps: {e}", err=True)
-                    finally:
-                        os.chdir(original_cwd)
-                        click.echo(f"Restored directory to {original_cwd}.")
-            except Exception as e:
-                click.echo(f"Warning: Could not read package metadata: {e}", err=True)
+                                click.echo("Skipped this step.")
+                        else:
+                            click.echo(f"Unknown or unsupported step type: {step}", err=True)
+                except FileNotFoundError:
+                    click.echo(f"Error: Package directory {pkg_path} not found for running uninstall steps.", err=True)
+                except Exception as e:
+                    click.echo(f"Error running uninstall steps: {e}", err=True)
+        except FileNotFoundError:
+            pass  # No mcp_package.json, so no uninstall steps to run
+        except Exception as e:
+            click.echo(f"Warning: Could not read package metadata: {e}", err=True)
         
         # Remove the package directory
         try:
-            shutil.rmtree(pkg_path)
+            remove_package_directory(pkg_path)
             click.echo(f"Removed package directory: {pkg_path}")
+            # Forget parses of the removed package's metadata
+            invalidate_package_metadata_cache()
         except Exception as e:
             click.echo(f"Error removing package directory: {e}", err=True)
             return
@@ -117,20 +104,31 @@ def uninstall_command_func(package_name, target):
         remove_package_from_local_db(package_name)
         
         # Check if the package was configured for any IDE and offer to remove configurations
+        config_ops = []
+        confirmed_tools = []
         for target_tool in ["windsurf"]:  # Add more tools as needed
             config_path = get_target_config_path(target_tool)
-            if config_path and config_path.exists():
+            if config_path:
                 try:
-                    with open(config_path, 'r') as f:
-                        config_data = json.load(f)
+                    # Parsed once here and reused when the removal is applied
+                    config_data = read_config_file(config_path)
                     
                     if 'mcpServers' in config_data and config_key_name in config_data['mcpServers']:
                         if click.confirm(f"Package '{package_name}' is configured for {target_tool}. Remove configuration?", default=True):
-                            if remove_server_from_mcp_config(config_path, config_key_name):
-                                click.echo(f"Successfully removed configuration from {target_tool}.")
-                            else:
-                                click.echo(f"Failed to remove configuration from {target_tool}.", err=True)
+                            config_ops.append(("remove", config_path, config_key_name, None))
+                            confirmed_tools.append((target_tool, config_path))
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
                     click.echo(f"Warning: Could not check/remove IDE configuration: {e}", err=True)
         
+        # Apply all confirmed removals with one read/write per config file
+        if config_ops:
+            results = apply_mcp_config_ops(config_ops)
+            for target_tool, config_path in confirmed_tools:
+                if results[config_path]:
+                    click.echo(f"Successfully removed configuration from {target_tool} at {config_path}.")
+                else:
+                    click.echo(f"Failed to remove configuration from {target_tool}.", err=True)
+        
         click.echo(f"Successfully uninstalled package {package_name}.")
@@ -13,11 +13,20 @@ INSTALL_DIR = Path("~/.mcpm/packages").expanduser()
 DEFAULT_REGISTRY_URL = "http://localhost:8000/api"  # Example default
 # Environment variable name for the registry URL
 REGISTRY_URL_ENV_VAR = "MCPM_REGISTRY_URL"
+# How long (in seconds) registry list responses are served from the local cache
+REGISTRY_CACHE_TTL = 60
+
+# --- Package Metadata Constants ---
+# Fields every mcp_package.json must define (checked by create and publish)
+REQUIRED_PACKAGE_FIELDS = ("name", "version")
 
 # --- Configuration Constants ---
 # Environment variable for Windsurf config path override
 WINDSURF_CONFIG_ENV_VAR = "WINDSURF_MCP_CONFIG_PATH"
 
+# Environment variable that makes config writes durable (fsync before the atomic rename)
+DURABLE_WRITES_ENV_VAR = "MCPM_DURABLE_WRITES"
+
 # Default target tool configuration paths
 DEFAULT_TARGET_CONFIG_PATHS = {
     "windsurf": Path("~/.codeium/windsurf/mcp_config.json"),
@@ -2,14 +2,25 @@
 Configuration file management for MCP tools.
 """
 import os
-import json
+import re
+import stat
+import functools
+import contextlib
 import click
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from mcpm.config.constants import DEFAULT_TARGET_CONFIG_PATHS, WINDSURF_CONFIG_ENV_VAR
+from mcpm import _json
+from mcpm.log import logger
+from mcpm.config.constants import DEFAULT_TARGET_CONFIG_PATHS, WINDSURF_CONFIG_ENV_VAR, DURABLE_WRITES_ENV_VAR
 
+@functools.lru_cache(maxsize=None)
 def get_target_config_path(target_tool):
-    """Gets the configuration file path for a target tool."""
+    """Gets the configuration file path for a target tool.
+
+    The result only depends on the tool name and the process environment, so it is
+    resolved once per invocation.
+    """
     if target_tool == "windsurf":
         # Check environment variable override first
         override_path = os.getenv(WINDSURF_CONFIG_ENV_VAR)
@@ -19,6 +30,208 @@ def get_target_config_path(target_tool):
     path = DEFAULT_TARGET_CONFIG_PATHS.get(target_tool)
     return path.expanduser() if path else None
 
+# Parsed target configs keyed by path, validated against (st_mtime_ns, st_size)
+_config_cache = {}
+
+def read_config_file(config_path: Path):
+    """
+    Reads and parses a target MCP JSON configuration file.
+
+    Parses are memoized for the duration of the invocation and revalidated with a
+    single stat, so reading the same config twice (e.g. check then remove) only
+    parses it once. Raises FileNotFoundError if the file does not exist.
+    Callers that mutate the returned dict must write it back with _write_config_file.
+    """
+    key = str(config_path)
+    st = os.stat(key)
+    cached = _config_cache.get(key)
+    if cached and cached[0] == (st.st_mtime_ns, st.st_size):
+        return cached[1]
+    with open(key, 'rb') as f:
+        config = _json.loads(f.read())
+    _config_cache[key] = ((st.st_mtime_ns, st.st_size), config)
+    return config
+
+def _durable_writes():
+    """Whether config writes should be flushed to disk before they are committed."""
+    return os.getenv(DURABLE_WRITES_ENV_VAR, "").lower() not in ("", "0", "false", "no")
+
+def _fsync_directory(path):
+    """Flushes a directory entry (e.g. a completed rename) to disk; a no-op where directories can't be opened."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return  # Windows
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_config_file(config_path: Path, config: dict):
+    """
+    Writes a target MCP JSON configuration file atomically.
+
+    The document is serialized once, written to a temporary sibling file and moved
+    over the target with os.replace, so an interrupted write never leaves a truncated
+    config behind. Only when MCPM_DURABLE_WRITES is set are the data and then the
+    parent directory (so the rename itself survives a crash) fsynced, and nothing is
+    written when the file already holds exactly these bytes.
+    """
+    key = str(config_path)
+    data = _json.dumps(config)
+    # Write through symlinks (e.g. dotfile managers) instead of replacing the link itself
+    target = os.path.realpath(key)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        try:
+            st = os.stat(target)
+            mode = stat.S_IMODE(st.st_mode)
+            # Leave byte-identical files (and their mtime / file watchers) untouched
+            if st.st_size == len(data):
+                with open(target, 'rb') as f:
+                    if f.read() == data:
+                        _config_cache[key] = ((st.st_mtime_ns, st.st_size), config)
+                        return
+        except FileNotFoundError:
+            mode = 0o600
+        durable = _durable_writes()
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if durable:
+                getattr(os, "fdatasync", os.fsync)(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, target)
+        if durable:
+            _fsync_directory(os.path.dirname(target))
+    except OSError:
+        # The cached parse may have been mutated by the caller; drop it
+        _config_cache.pop(key, None)
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+    st = os.stat(key)
+    _config_cache[key] = ((st.st_mtime_ns, st.st_size), config)
+
+def apply_mcp_config_ops(ops, max_workers=None):
+    """
+    Applies a batch of add/remove operations to target MCP JSON configuration files.
+
+    Operations are grouped by config file so each file is read, mutated and written
+    once, no matter how many servers in it are touched. Distinct files are independent
+    and are committed concurrently on a small thread pool.
+
+    Args:
+        ops: Iterable of (action, config_path, server_key, server_config) tuples. action is
+            'add' or 'remove'; server_config is the entry to store and is ignored for removals.
+        max_workers: Upper bound on concurrent file commits (defaults to min(8, files)).
+
+    Returns:
+        A dict mapping each config path to True if it was updated (or nothing needed to
+        change) and False on error.
+    """
+    groups = {}
+    for action, config_path, server_key, server_config in ops:
+        groups.setdefault(config_path, []).append((action, server_key, server_config))
+    
+    if len(groups) <= 1:
+        return {config_path: _commit_config_ops(config_path, group) for config_path, group in groups.items()}
+    
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, len(groups))) as executor:
+        futures = {config_path: executor.submit(_commit_config_ops, config_path, group)
+                   for config_path, group in groups.items()}
+    return {config_path: future.result() for config_path, future in futures.items()}
+
+# Server keys that can only be spelled verbatim in JSON text (no escape sequence can produce them)
+_PLAIN_SERVER_KEY = re.compile(r'[A-Za-z0-9_.@:+-]+\Z')
+
+def _config_lacks_server_keys(config_path: Path, server_keys):
+    """
+    Cheap pre-check for removals: scans the raw file bytes for the quoted keys without
+    parsing the document.
+    
+    Returns:
+        True only if none of the keys can occur in the file; False whenever a full parse
+        is needed to tell (already-parsed file, unusual keys, escapes, read errors).
+    """
+    key = str(config_path)
+    if key in _config_cache or not all(_PLAIN_SERVER_KEY.match(k) for k in server_keys):
+        return False
+    try:
+        with open(key, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return False
+    if b'\\u' in data:
+        return False
+    return not any(f'"{k}"'.encode('ascii') in data for k in server_keys)
+
+def _commit_config_ops(config_path: Path, ops):
+    """Reads one target config, applies all of its pending operations in memory and writes it back once."""
+    has_additions = any(action == "add" for action, _, _ in ops)
+    
+    # Removing servers that are not mentioned anywhere in the file needs no parse
+    if not has_additions and _config_lacks_server_keys(config_path, [server_key for _, server_key, _ in ops]):
+        for _, server_key, _ in ops:
+            logger.info("Server '%s' not found in %s. Nothing to remove.", server_key, config_path)
+        return True
+    
+    # Read the existing configuration file or create a new one
+    existing_config = {}
+    try:
+        existing_config = read_config_file(config_path)
+    except FileNotFoundError:
+        if not has_additions:
+            # If the config file doesn't exist, there's nothing to remove
+            click.echo(f"Configuration file {config_path} does not exist. Nothing to remove.", err=True)
+            return True  # Not an error, just nothing to do
+    except _json.JSONDecodeError:
+        if not has_additions:
+            click.echo(f"Error: Could not parse configuration file {config_path}.", err=True)
+            return False
+        click.echo(f"Warning: Could not parse existing configuration file {config_path}. Will create a new one.", err=True)
+    except IOError as e:
+        if not has_additions:
+            click.echo(f"Error reading configuration file {config_path}: {e}", err=True)
+            return False
+        click.echo(f"Warning: Could not read existing configuration file {config_path}: {e}. Will create a new one.", err=True)
+    
+    # Ensure the mcpServers key exists in the existing config
+    if has_additions:
+        mcp_servers = existing_config.setdefault('mcpServers', {})
+    else:
+        mcp_servers = existing_config.get('mcpServers', {})
+    
+    changed = False
+    for action, server_key, server_config in ops:
+        if action == "add":
+            # Idempotent re-runs leave the file untouched
+            if server_key in mcp_servers and mcp_servers[server_key] == server_config:
+                logger.info("Server '%s' in %s is already up to date.", server_key, config_path)
+                continue
+            mcp_servers[server_key] = server_config
+            changed = True
+        elif server_key in mcp_servers:
+            del mcp_servers[server_key]
+            changed = True
+        else:
+            logger.info("Server '%s' not found in %s. Nothing to remove.", server_key, config_path)
+    
+    if not changed:
+        return True  # Not an error, just nothing to do
+    
+    # Write the updated configuration back to the file
+    try:
+        # Ensure parent directory exists
+        config_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_config_file(config_path, existing_config)
+        return True
+    except IOError as e:
+        click.echo(f"Error writing configuration to {config_path}: {e}", err=True)
+        return False
+
 def update_mcp_config_file(config_path: Path, server_registry_name: str, server_config_str: str):
     """
     Reads, updates, and writes the target MCP JSON configuration file.
@@ -34,16 +247,13 @@ def update_mcp_config_file(config_path: Path, server_registry_name: str, server_
         click.echo("Error: No configuration path provided.", err=True)
         return False
     
-    # Ensure parent directory exists
-    config_path.parent.mkdir(parents=True, exist_ok=True)
-    
     # Parse the server configuration JSON string
     try:
-        server_config = json.loads(server_config_str)
+        server_config = _json.loads(server_config_str)
         if not isinstance(server_config, dict) or 'mcpServers' not in server_config:
             click.echo(f"Error: Invalid server configuration format. Expected a JSON object with 'mcpServers' key.", err=True)
             return False
-    except json.JSONDecodeError:
+    except _json.JSONDecodeError:
         click.echo(f"Error: Could not parse server configuration JSON: {server_config_str}", err=True)
         return False
     
@@ -62,33 +272,7 @@ def update_mcp_config_file(config_path: Path, server_registry_name: str, server_
     server_short_name = next(iter(mcpServers))
     server_config_obj = mcpServers[server_short_name]
     
-    # Read the existing configuration file or create a new one
-    existing_config = {}
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                existing_config = json.load(f)
-        except json.JSONDecodeError:
-            click.echo(f"Warning: Could not parse existing configuration file {config_path}. Will create a new one.", err=True)
-        except IOError as e:
-            click.echo(f"Warning: Could not read existing configuration file {config_path}: {e}. Will create a new one.", err=True)
-    
-    # Ensure the mcpServers key exists in the existing config
-    if 'mcpServers' not in existing_config:
-        existing_config['mcpServers'] = {}
-    
-    # Update the server configuration
-    existing_config['mcpServers'][server_short_name] = server_config_obj
-    
-    # Write the updated configuration back to the file
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(existing_config, f, indent=2)
-        click.echo(f"Successfully updated configuration at {config_path}")
-        return True
-    except IOError as e:
-        click.echo(f"Error writing configuration to {config_path}: {e}", err=True)
-        return False
+    return apply_mcp_config_ops([("add", config_path, server_short_name, server_config_obj)])[config_path]
 
 def remove_server_from_mcp_config(config_path: Path, server_short_name: str):
     """
@@ -105,44 +289,7 @@ def remove_server_from_mcp_config(config_path: Path, server_short_name: str):
         click.echo("Error: No configuration path provided.", err=True)
         return False
     
-    # If the config file doesn't exist, there's nothing to remove
-    if not config_path.exists():
-        click.echo(f"Configuration file {config_path} does not exist. Nothing to remove.", err=True)
-        return True  # Not an error, just nothing to do
-    
-    # Read the existing configuration file
-    try:
-        with open(config_path, 'r') as f:
-            existing_config = json.load(f)
-    except json.JSONDecodeError:
-        click.echo(f"Error: Could not parse configuration file {config_path}.", err=True)
-        return False
-    except IOError as e:
-        click.echo(f"Error reading configuration file {config_path}: {e}", err=True)
-        return False
-    
-    # Check if the mcpServers key exists
-    if 'mcpServers' not in existing_config:
-        click.echo(f"No 'mcpServers' key found in {config_path}. Nothing to remove.")
-        return True  # Not an error, just nothing to do
-    
-    # Check if the server exists in the configuration
-    if server_short_name not in existing_config['mcpServers']:
-        click.echo(f"Server '{server_short_name}' not found in {config_path}. Nothing to remove.")
-        return True  # Not an error, just nothing to do
-    
-    # Remove the server from the configuration
-    del existing_config['mcpServers'][server_short_name]
-    
-    # Write the updated configuration back to the file
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(existing_config, f, indent=2)
-        click.echo(f"Successfully removed server '{server_short_name}' from {config_path}")
-        return True
-    except IOError as e:
-        click.echo(f"Error writing configuration to {config_path}: {e}", err=True)
-        return False
+    return apply_mcp_config_ops([("remove", config_path, server_short_name, None)])[config_path]
 
 def update_mcp_config_file_for_configure(config_path: Path, server_key_in_target: str, config_snippet_obj: dict, package_install_path: Path, input_values=None):
     """
@@ -160,39 +307,89 @@ def update_mcp_config_file_for_configure(config_path: Path, server_key_in_target
         click.echo("Error: No configuration path provided.", err=True)
         return False
     
-    # Ensure parent directory exists
-    config_path.parent.mkdir(parents=True, exist_ok=True)
+    # Process the config snippet to resolve relative paths and substitute variables
+    processed_config = _process_config_snippet(config_snippet_obj, package_install_path, input_values)
     
-    # Read the existing configuration file or create a new one
-    existing_config = {}
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                existing_config = json.load(f)
-        except json.JSONDecodeError:
-            click.echo(f"Warning: Could not parse existing configuration file {config_path}. Will create a new one.", err=True)
-        except IOError as e:
-            click.echo(f"Warning: Could not read existing configuration file {config_path}: {e}. Will create a new one.", err=True)
+    return apply_mcp_config_ops([("add", config_path, server_key_in_target, processed_config)])[config_path]
+
+# Outcome messages, formatted lazily by the logger from a mapping of the call's values
+_MSG_ADD_OK = "Successfully configured %(pkg)s for %(ide)s at %(path)s."
+_MSG_ADD_FAIL = "Failed to configure %(pkg)s for %(ide)s."
+_MSG_REMOVE_OK = "Successfully removed %(pkg)s configuration from %(ide)s at %(path)s."
+_MSG_REMOVE_FAIL = "Failed to remove %(pkg)s configuration from %(ide)s."
+
+def _do_add(package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values):
+    """Adds or updates the package's server entry in the target IDE configuration."""
+    ok = update_mcp_config_file_for_configure(config_path, install_name, ide_config, pkg_install_path, input_values)
+    return ok, _MSG_ADD_OK if ok else _MSG_ADD_FAIL
+
+def _do_remove(package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values):
+    """Removes the package's server entry from the target IDE configuration."""
+    ok = remove_server_from_mcp_config(config_path, install_name)
+    return ok, _MSG_REMOVE_OK if ok else _MSG_REMOVE_FAIL
+
+# Configure actions, keyed by the values accepted by --action and offered interactively
+_CONFIG_ACTIONS = {
+    "add": _do_add,
+    "remove": _do_remove,
+}
+
+def dispatch_config_action(action, package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values):
+    """
+    Runs a configure action via the _CONFIG_ACTIONS table and logs its outcome.
     
-    # Ensure the mcpServers key exists in the existing config
-    if 'mcpServers' not in existing_config:
-        existing_config['mcpServers'] = {}
+    Args:
+        action: 'add' or 'remove'.
+        package_name: Name of the package being configured (for messages).
+        target_ide: Target IDE name.
+        config_path: Path to the target IDE configuration file.
+        install_name: Key of the server entry in the target configuration.
+        ide_config: The package's configuration snippet for the target IDE.
+        pkg_install_path: Path to the package installation directory.
+        input_values: Stored input values to substitute into the snippet.
+    """
+    ok, message = _CONFIG_ACTIONS[action](package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values)
+    values = {"pkg": package_name, "ide": target_ide, "path": config_path}
+    if ok:
+        logger.info(message, values)
+    else:
+        logger.error(message, values)
+
+def _substitute_input_values(value, input_values):
+    """
+    Returns a copy of a JSON-like value with ${var} placeholders replaced in every
+    string (keys included).
     
-    # Process the config snippet to resolve relative paths and substitute variables
-    processed_config = _process_config_snippet(config_snippet_obj, package_install_path, input_values)
+    All placeholders are replaced in one regex pass per string, and the structure is
+    copied with an explicit stack instead of recursion.
     
-    # Update the server configuration
-    existing_config['mcpServers'][server_key_in_target] = processed_config
+    Args:
+        value: A dict, list, string or scalar from a configuration snippet.
+        input_values: Dictionary of input values keyed by variable name.
+    """
+    pattern = re.compile(r'\$\{(' + '|'.join(map(re.escape, input_values)) + r')\}')
+    replace = lambda match: input_values[match.group(1)]
     
-    # Write the updated configuration back to the file
-    try:
-        with open(config_path, 'w') as f:
-            json.dump(existing_config, f, indent=2)
-        click.echo(f"Successfully updated configuration at {config_path}")
-        return True
-    except IOError as e:
-        click.echo(f"Error writing configuration to {config_path}: {e}", err=True)
-        return False
+    root = [None]
+    # (container, key, item): item's copy is stored at container[key]
+    pending = [(root, 0, value)]
+    while pending:
+        container, key, item = pending.pop()
+        if isinstance(item, str):
+            container[key] = pattern.sub(replace, item)
+        elif isinstance(item, dict):
+            copy = container[key] = {}
+            for k, v in item.items():
+                if isinstance(k, str):
+                    k = pattern.sub(replace, k)
+                copy[k] = None  # Reserve the slot so key order is kept
+                pending.append((copy, k, v))
+        elif isinstance(item, list):
+            copy = container[key] = [None] * len(item)
+            pending.extend((copy, i, v) for i, v in enumerate(item))
+        else:
+            container[key] = item
+    return root[0]
 
 def _process_config_snippet(config_snippet: dict, package_install_path: Path, input_values=None):
     """
@@ -206,26 +403,15 @@ def _process_config_snippet(config_snippet: dict, package_install_path: Path, in
     Returns:
         A processed copy of the configuration snippet with resolved paths and substituted variables.
     """
-    import copy
-    import json
-    
-    # Make a deep copy to avoid modifying the original
-    processed = copy.deepcopy(config_snippet)
+    if input_values:
+        # Substitute variables while copying, instead of a dumps/replace/loads round trip
+        processed = _substitute_input_values(config_snippet, input_values)
+    else:
+        # Only the top-level 'path' key is rewritten, so a shallow copy protects the original
+        processed = dict(config_snippet)
     
     # Resolve relative paths in the configuration
     if 'path' in processed and processed['path'] == '.':
         processed['path'] = str(package_install_path)
     
-    # Substitute variables in string values if input_values provided
-    if input_values:
-        # Convert to JSON string
-        config_str = json.dumps(processed)
-        
-        # Substitute variables in the string
-        for var, val in input_values.items():
-            config_str = config_str.replace(f"${{{var}}}", val)
-        
-        # Convert back to dict
-        processed = json.loads(config_str)
-    
     return processed
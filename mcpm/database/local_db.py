@@ -1,54 +1,144 @@
 """
 Local SQLite database operations for tracking installed packages.
 """
+import atexit
+import contextlib
+import functools
 import sqlite3
+import threading
+import time
 import click
 import json
 from pathlib import Path
 
 from mcpm.config.constants import LOCAL_DB_DIR, LOCAL_DB_PATH
 
+# Serializes the first connect, which may race between worker threads now that it
+# also bootstraps the schema
+_connection_lock = threading.Lock()
+
 def _get_local_db_connection():
-    """Ensures the local DB directory exists and returns a SQLite connection."""
+    """Returns the process-wide SQLite connection, opening it on first use (None on error)."""
+    with _connection_lock:
+        return _open_local_db_connection()
+
+@functools.lru_cache(maxsize=1)
+def _open_local_db_connection():
+    """
+    Ensures the local DB directory exists and returns the process-wide SQLite connection.
+    
+    The connection is opened once per invocation, tuned with PRAGMAs and closed at exit,
+    so helpers called back-to-back share a warm page cache instead of reconnecting.
+    The schema is created or upgraded right after connecting, so commands need no
+    separate bootstrap step. It may be used from worker threads (e.g. concurrent
+    registry fetches); SQLite serializes access to the connection itself.
+    """
     try:
         LOCAL_DB_DIR.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(LOCAL_DB_PATH)
+        conn = sqlite3.connect(LOCAL_DB_PATH, check_same_thread=False)
+        # Rows support both index and column-name access
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        atexit.register(conn.close)
+        _init_schema(conn)
         return conn
     except sqlite3.Error as e:
         click.echo(f"Error connecting to local database {LOCAL_DB_PATH}: {e}", err=True)
         return None
 
-def init_local_db():
-    """Initializes the local SQLite database and creates tables if they don't exist."""
+# Held for the whole of a transaction() block. The connection (and so its open
+# transaction) is shared by every thread, so writes from other threads (e.g. the
+# registry fetch workers) wait instead of joining or committing another thread's work
+_transaction_lock = threading.RLock()
+# Per-thread nesting depth of transaction() blocks; only the outermost one commits
+_transaction_state = threading.local()
+
+@contextlib.contextmanager
+def transaction():
+    """
+    Groups the helper calls made inside the block into one SQLite transaction.
+    
+    Every write helper runs in its own transaction() block, so on its own it commits
+    once; inside an enclosing block its work stays open and is committed once when
+    the outermost block exits, or rolled back if it raises. Blocks may nest within a
+    thread; a block in another thread waits until the current one has finished.
+    
+    Yields:
+        The shared connection (None if the database could not be opened).
+    """
     conn = _get_local_db_connection()
-    if conn:
+    with _transaction_lock:
+        depth = getattr(_transaction_state, "depth", 0)
+        _transaction_state.depth = depth + 1
         try:
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS installed_packages (
-                    name TEXT PRIMARY KEY,
-                    version TEXT NOT NULL,
-                    install_path TEXT NOT NULL,
-                    installed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create table for storing package input values
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS package_input_values (
-                    package_name TEXT NOT NULL,
-                    input_name TEXT NOT NULL,
-                    input_value TEXT NOT NULL,
-                    is_secret INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    PRIMARY KEY (package_name, input_name)
-                )
-            ''')
-            conn.commit()
-        except sqlite3.Error as e:
-            click.echo(f"Error initializing local database table: {e}", err=True)
+            yield conn
+        except BaseException:
+            if conn and depth == 0:
+                conn.rollback()
+            raise
+        else:
+            if conn and depth == 0:
+                conn.commit()
         finally:
-            conn.close()
+            _transaction_state.depth = depth
+
+# Schema version stored in PRAGMA user_version; bump it when the schema below changes
+_SCHEMA_VERSION = 2
+
+def init_local_db():
+    """Initializes the local SQLite database and creates tables if they don't exist.
+    
+    Every helper does this lazily on first use; calling it is only needed to
+    initialize the database eagerly.
+    """
+    _get_local_db_connection()
+
+def _init_schema(conn):
+    """Creates or upgrades the schema of a freshly opened connection.
+    
+    The schema script only runs for databases older than _SCHEMA_VERSION, so an
+    up-to-date database costs a single PRAGMA read per invocation.
+    """
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+            return
+        conn.executescript(f'''
+            BEGIN;
+            CREATE TABLE IF NOT EXISTS installed_packages (
+                name TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                install_path TEXT NOT NULL,
+                installed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            
+            -- Stored package input values
+            CREATE TABLE IF NOT EXISTS package_input_values (
+                package_name TEXT NOT NULL,
+                input_name TEXT NOT NULL,
+                input_value TEXT NOT NULL,
+                is_secret INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (package_name, input_name)
+            );
+            
+            -- Cached raw registry responses; disposable, so it is rebuilt on schema upgrades
+            DROP TABLE IF EXISTS registry_cache;
+            CREATE TABLE registry_cache (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            );
+            
+            PRAGMA user_version = {_SCHEMA_VERSION};
+            COMMIT;
+        ''')
+    except sqlite3.Error as e:
+        click.echo(f"Error initializing local database table: {e}", err=True)
 
 def is_package_installed(package_install_name):
     """Checks if a package is listed as installed in the local database."""
@@ -61,48 +151,55 @@ def is_package_installed(package_install_name):
         except sqlite3.Error as e:
             click.echo(f"Error querying local database for {package_install_name}: {e}", err=True)
             return False
-        finally:
-            conn.close()
     return False
 
 def add_package_to_local_db(install_name, version, install_path):
     """Adds or updates a package record in the local installed_packages database."""
-    conn = _get_local_db_connection()
-    if conn:
-        try:
-            cursor = conn.cursor()
-            cursor.execute('''
+    add_packages_to_local_db([(install_name, version, install_path)])
+
+def add_packages_to_local_db(rows):
+    """Adds or updates several package records in a single transaction.
+    
+    Args:
+        rows: Iterable of (install_name, version, install_path) tuples.
+    """
+    rows = [(install_name, version, str(install_path)) for install_name, version, install_path in rows]
+    if not rows:
+        return
+    
+    try:
+        with transaction() as conn:
+            if not conn:
+                return
+            # One statement and one commit for the whole batch
+            conn.executemany('''
                 INSERT OR REPLACE INTO installed_packages (name, version, install_path, installed_at)
                 VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (install_name, version, str(install_path)))
-            conn.commit()
+            ''', rows)
+        for install_name, version, _ in rows:
             click.echo(f"Package {install_name} (v{version}) marked as installed locally.")
-        except sqlite3.Error as e:
-            click.echo(f"Error adding package {install_name} to local database: {e}", err=True)
-        finally:
-            conn.close()
+    except sqlite3.Error as e:
+        names = ", ".join(install_name for install_name, _, _ in rows)
+        click.echo(f"Error adding package {names} to local database: {e}", err=True)
 
 def remove_package_from_local_db(install_name):
     """Removes a package record from the local installed_packages database."""
-    conn = _get_local_db_connection()
-    if conn:
-        try:
+    try:
+        with transaction() as conn:
+            if not conn:
+                return
             cursor = conn.cursor()
             # Remove from installed_packages table
             cursor.execute("DELETE FROM installed_packages WHERE name = ?", (install_name,))
             
             # Also remove any stored input values for this package
             cursor.execute("DELETE FROM package_input_values WHERE package_name = ?", (install_name,))
-            
-            conn.commit()
-            if cursor.rowcount > 0:
-                click.echo(f"Package {install_name} marked as uninstalled locally.")
-            else:
-                click.echo(f"Package {install_name} was not found in the local installation record.", err=True)
-        except sqlite3.Error as e:
-            click.echo(f"Error removing package {install_name} from local database: {e}", err=True)
-        finally:
-            conn.close()
+        if cursor.rowcount > 0:
+            click.echo(f"Package {install_name} marked as uninstalled locally.")
+        else:
+            click.echo(f"Package {install_name} was not found in the local installation record.", err=True)
+    except sqlite3.Error as e:
+        click.echo(f"Error removing package {install_name} from local database: {e}", err=True)
 
 def get_all_installed_package_details():
     """Fetches details for all installed packages from the local database.
@@ -117,23 +214,59 @@ def get_all_installed_package_details():
     try:
         cursor = conn.cursor()
         cursor.execute("SELECT name, version, install_path, installed_at FROM installed_packages")
-        rows = cursor.fetchall()
-        
-        # Convert rows to a list of dictionaries
-        packages = []
-        for row in rows:
-            packages.append({
-                "name": row[0],
-                "version": row[1],
-                "install_path": row[2],
-                "installed_at": row[3]
-            })
-        return packages
+        return [dict(row) for row in cursor]
     except sqlite3.Error as e:
         click.echo(f"Error fetching installed packages: {e}", err=True)
         return []
-    finally:
-        conn.close()
+
+def get_installed_packages_by_name():
+    """Fetches details for all installed packages, keyed by package name.
+    
+    Returns:
+        A dictionary mapping each installed name to its details (name, version,
+        install_path, installed_at).
+    """
+    conn = _get_local_db_connection()
+    if not conn:
+        return {}
+        
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name, version, install_path, installed_at FROM installed_packages")
+        return {row["name"]: dict(row) for row in cursor}
+    except sqlite3.Error as e:
+        click.echo(f"Error fetching installed packages: {e}", err=True)
+        return {}
+
+def get_installed_packages_by_names(names):
+    """Fetches details for the given installed packages with a single query.
+    
+    Args:
+        names: Iterable of package names (install_name) to look up.
+        
+    Returns:
+        A dictionary mapping each installed name to its details (name, version,
+        install_path, installed_at). Names that are not installed are omitted.
+    """
+    names = list(names)
+    if not names:
+        return {}
+    
+    conn = _get_local_db_connection()
+    if not conn:
+        return {}
+        
+    try:
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(names))
+        cursor.execute(
+            f"SELECT name, version, install_path, installed_at FROM installed_packages WHERE name IN ({placeholders})",
+            names
+        )
+        return {row["name"]: dict(row) for row in cursor}
+    except sqlite3.Error as e:
+        click.echo(f"Error fetching installed packages: {e}", err=True)
+        return {}
 
 def store_package_input_values(package_name, input_values):
     """Stores input values for a package in the local database.
@@ -145,29 +278,25 @@ def store_package_input_values(package_name, input_values):
     if not input_values:
         return
         
-    conn = _get_local_db_connection()
-    if not conn:
-        return
-        
     try:
-        cursor = conn.cursor()
-        for input_name, input_value in input_values.items():
-            # Check if this is a secret value
-            is_secret = False
-            
-            # Store the input value
-            cursor.execute('''
-                INSERT OR REPLACE INTO package_input_values 
-                (package_name, input_name, input_value, is_secret, created_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (package_name, input_name, input_value, 1 if is_secret else 0))
+        with transaction() as conn:
+            if not conn:
+                return
+            cursor = conn.cursor()
+            for input_name, input_value in input_values.items():
+                # Check if this is a secret value
+                is_secret = False
+                
+                # Store the input value
+                cursor.execute('''
+                    INSERT OR REPLACE INTO package_input_values 
+                    (package_name, input_name, input_value, is_secret, created_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ''', (package_name, input_name, input_value, 1 if is_secret else 0))
         
-        conn.commit()
         click.echo(f"Stored input values for package {package_name}.")
     except sqlite3.Error as e:
         click.echo(f"Error storing input values for package {package_name}: {e}", err=True)
-    finally:
-        conn.close()
 
 def get_package_input_values(package_name):
     """Retrieves stored input values for a package from the local database.
@@ -200,5 +329,71 @@ def get_package_input_values(package_name):
     except sqlite3.Error as e:
         click.echo(f"Error retrieving input values for package {package_name}: {e}", err=True)
         return {}
-    finally:
-        conn.close()
+
+def get_registry_cache_entry(url):
+    """Returns the cached response for a registry URL, however old it is.
+    
+    The cache is best-effort: any database error is treated as a miss.
+    
+    Args:
+        url: The registry URL the response was fetched from.
+        
+    Returns:
+        A dictionary with body (bytes), fetched_at (epoch seconds), etag and
+        last_modified (validators for conditional requests, may be None), or None.
+    """
+    conn = _get_local_db_connection()
+    if not conn:
+        return None
+        
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT body, fetched_at, etag, last_modified FROM registry_cache WHERE url = ?",
+            (url,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        entry = dict(row)
+        entry["body"] = bytes(entry["body"])
+        return entry
+    except sqlite3.Error:
+        return None
+
+def store_registry_response(url, body, etag=None, last_modified=None):
+    """Stores the raw response body for a registry URL in the local cache (best-effort).
+    
+    Args:
+        url: The registry URL the response was fetched from.
+        body: The raw response body (bytes).
+        etag: The response's ETag header, if any.
+        last_modified: The response's Last-Modified header, if any.
+    """
+    try:
+        with transaction() as conn:
+            if conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO registry_cache (url, body, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+                    (url, sqlite3.Binary(body), time.time(), etag, last_modified)
+                )
+    except sqlite3.Error:
+        pass
+
+def touch_registry_response(url):
+    """Marks a cached registry response as fresh again, e.g. after a 304 Not Modified (best-effort)."""
+    try:
+        with transaction() as conn:
+            if conn:
+                conn.execute("UPDATE registry_cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
+    except sqlite3.Error:
+        pass
+
+def clear_registry_cache():
+    """Removes all cached registry responses (best-effort)."""
+    try:
+        with transaction() as conn:
+            if conn:
+                conn.execute("DELETE FROM registry_cache")
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,28 @@
+"""
+Logger for MCPM status messages.
+
+Messages are formatted lazily (logging's %-style arguments), so nothing is formatted
+when the logger's level filters them out, e.g. under `mcpm --quiet`.
+"""
+import logging
+import click
+
+logger = logging.getLogger("mcpm")
+
+class _ClickEchoHandler(logging.Handler):
+    """Emits log records through click.echo; warnings and errors go to stderr."""
+
+    def emit(self, record):
+        try:
+            click.echo(self.format(record), err=record.levelno >= logging.WARNING)
+        except Exception:
+            self.handleError(record)
+
+if not logger.handlers:
+    logger.addHandler(_ClickEchoHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def set_quiet(quiet):
+    """Suppresses informational status messages when quiet is True."""
+    logger.setLevel(logging.WARNING if quiet else logging.INFO)
@@ -2,34 +2,119 @@
 API interactions with the MCP registry.
 """
 import os
-import requests
+import atexit
+import functools
+import tempfile
+import threading
+import time
 import click
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-from mcpm.config.constants import DEFAULT_REGISTRY_URL, REGISTRY_URL_ENV_VAR
+from mcpm import _json
+from mcpm.config.constants import DEFAULT_REGISTRY_URL, REGISTRY_URL_ENV_VAR, REGISTRY_CACHE_TTL
+from mcpm.database.local_db import get_registry_cache_entry, store_registry_response, touch_registry_response, clear_registry_cache
 
+@functools.lru_cache(maxsize=None)
 def get_registry_url():
-    """Gets the registry URL from environment variable or uses default."""
+    """Gets the registry URL from environment variable or uses default.
+
+    The environment is read once per invocation; call get_registry_url.cache_clear()
+    after changing MCPM_REGISTRY_URL in-process.
+    """
     return os.environ.get(REGISTRY_URL_ENV_VAR, DEFAULT_REGISTRY_URL)
 
+# Shared HTTP session, so registry calls within one invocation reuse keep-alive connections
+_session = None
+# Guards the session's creation: the first call usually comes from the concurrent
+# fetches in get_registry_listings
+_session_lock = threading.Lock()
+
+def get_session():
+    """Returns the requests.Session shared by all registry calls (including publish), creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests is only imported once a command actually talks to the registry
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                session = requests.Session()
+                # Keep enough pooled connections for the concurrent registry fetches, and retry
+                # transient connection failures; urllib3 never retries non-idempotent POSTs
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                atexit.register(session.close)
+                _session = session
+    return _session
+
+# Parsed registry responses keyed by URL, reused for the rest of the invocation
+# (e.g. across redraws of the interactive list)
+_registry_responses = {}
+
+def _get_registry_json(url):
+    """
+    GETs a registry URL and parses its JSON body.
+    
+    Each URL is fetched at most once per invocation. Responses younger than
+    REGISTRY_CACHE_TTL seconds are served from the local cache; older ones are
+    revalidated with If-None-Match/If-Modified-Since, so an unchanged listing costs a
+    304 instead of a full download. Raises requests.exceptions.RequestException or
+    json.JSONDecodeError on failure; failed responses are never cached.
+    """
+    data = _registry_responses.get(url)
+    if data is not None:
+        return data
+    
+    entry = get_registry_cache_entry(url)
+    headers = {}
+    if entry:
+        try:
+            if time.time() - entry["fetched_at"] < REGISTRY_CACHE_TTL:
+                data = _registry_responses[url] = _json.loads(entry["body"])
+                return data
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+            cached_data = _json.loads(entry["body"])
+        except _json.JSONDecodeError:
+            # Corrupt cache entry, fetch it again unconditionally
+            entry, headers = None, {}
+    
+    response = get_session().get(url, headers=headers)
+    if entry and response.status_code == 304:
+        touch_registry_response(url)
+        data = cached_data
+    else:
+        response.raise_for_status()
+        data = _json.loads(response.content)
+        store_registry_response(url, response.content,
+                                response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    _registry_responses[url] = data
+    return data
+
 def get_registry_packages():
     """Fetches the list of available packages (latest versions) from the registry."""
+    import requests
     packages_url = f"{get_registry_url()}/packages/"  # Append specific path
     try:
-        response = requests.get(packages_url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        return response.json()  # Assuming the registry returns JSON list of packages
+        return _get_registry_json(packages_url)  # Assuming the registry returns JSON list of packages
     except requests.exceptions.RequestException as e:
         click.echo(f"Error connecting to registry at {get_registry_url()}: {e}", err=True)
         return None
+    except json.JSONDecodeError:
+        click.echo("Error: Could not decode package list response from registry.", err=True)
+        return None
 
 def get_registry_servers():
     """Fetches the list of all registered servers from the registry."""
+    import requests
     servers_url = f"{get_registry_url()}/servers"  # Append specific path
     try:
-        response = requests.get(servers_url)
-        response.raise_for_status()
-        return response.json()
+        return _get_registry_json(servers_url)
     except requests.exceptions.RequestException as e:
         click.echo(f"Error fetching server list from registry: {e}", err=True)
         return None
@@ -37,50 +122,103 @@ def get_registry_servers():
         click.echo("Error: Could not decode server list response from registry.", err=True)
         return None
 
+def get_registry_listings():
+    """
+    Fetches the package list and the server list from the registry concurrently.
+    
+    Returns:
+        A (packages, servers) tuple; either element is None if its request failed.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        packages_future = executor.submit(get_registry_packages)
+        servers_future = executor.submit(get_registry_servers)
+    return packages_future.result(), servers_future.result()
+
+# Registry servers keyed by registry_name, built once per invocation by _load_servers_index
+_servers_index = None
+
+def _load_servers_index():
+    """
+    Returns the registry's servers keyed by registry_name, fetching and indexing the
+    server list on first use. Raises like _get_registry_json on failure.
+    """
+    global _servers_index
+    if _servers_index is None:
+        servers = _get_registry_json(f"{get_registry_url()}/servers")
+        _servers_index = {server['registry_name']: server for server in servers if 'registry_name' in server}
+    return _servers_index
+
+def invalidate_registry_cache():
+    """Drops cached registry data (local response cache, parsed responses and server index) after the registry changed."""
+    global _servers_index
+    _servers_index = None
+    _registry_responses.clear()
+    clear_registry_cache()
+
 def get_registry_server(server_registry_name):
     """Fetches server details by registry_name from the registry."""
+    import requests
     registry_url = get_registry_url()
     if not registry_url:
         return None  # Error already handled by caller typically
 
     try:
-        server_list_url = f"{registry_url}/servers"
-        response = requests.get(server_list_url)
-        response.raise_for_status()
-        servers = response.json()
-        for server in servers:
-            # IMPORTANT: Compare against 'registry_name'
-            if server.get('registry_name') == server_registry_name:
-                return server  # Return the full server details dict
-        return None  # Not found
+        # IMPORTANT: Servers are keyed by 'registry_name'
+        return _load_servers_index().get(server_registry_name)  # None if not found
     except requests.exceptions.RequestException as e:
         click.echo(f"Error contacting registry to check for server '{server_registry_name}': {e}", err=True)
         return None
     except json.JSONDecodeError:
         click.echo(f"Error decoding server list response when checking for '{server_registry_name}'.", err=True)
         return None
-    except KeyError:
-         click.echo(f"Error: Missing expected key ('registry_name'?) in server response when checking for '{server_registry_name}'.", err=True)
-         return None
 
 def download_package(package_name, version="latest"):
-    """Downloads a specific package version from the registry."""
+    """
+    Downloads a specific package version from the registry.
+    
+    The archive is streamed into an anonymous TemporaryFile instead of a file under
+    the install directory, so nothing is left behind if the install fails. (Not a
+    SpooledTemporaryFile: it lacks seekable() before Python 3.11, which ZipFile
+    needs.)
+    
+    Returns:
+        A file object positioned at the start of the archive (the caller closes it),
+        or None on error.
+    """
+    import requests
+
     # TODO: Implement version handling
     download_url = f"{get_registry_url()}/packages/{package_name}/{version}/download"  # Append specific path
     click.echo(f"Downloading {package_name} ({version}) from {download_url}...")
+    package_file = tempfile.TemporaryFile()
     try:
-        from mcpm.config.constants import INSTALL_DIR
-        
-        response = requests.get(download_url, stream=True)
-        response.raise_for_status()
-
-        # Save the downloaded package file temporarily
-        temp_package_path = INSTALL_DIR / f"{package_name}_{version}_temp.mcpz"
-        with open(temp_package_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        click.echo(f"Downloaded to {temp_package_path}")
-        return temp_package_path
-    except requests.exceptions.RequestException as e:
+        with get_session().get(download_url, stream=True) as response:
+            response.raise_for_status()
+            # Copied in large chunks; iter_content undoes any Content-Encoding and turns
+            # urllib3 errors (e.g. a connection dropped mid-body) into RequestExceptions
+            for chunk in response.iter_content(256 * 1024):
+                package_file.write(chunk)
+        size = package_file.tell()
+        package_file.seek(0)
+        click.echo(f"Downloaded {package_name} ({size} bytes)")
+        return package_file
+    except (requests.exceptions.RequestException, OSError) as e:
+        package_file.close()
         click.echo(f"Error downloading package {package_name}: {e}", err=True)
         return None
+
+def download_packages(package_names, version="latest", max_workers=4):
+    """
+    Downloads several packages from the registry concurrently.
+    
+    Downloads are latency-bound, so they overlap on a small thread pool over the
+    shared session instead of running back to back.
+    
+    Returns:
+        A dict mapping each package name to its downloaded file object (see
+        download_package), or None if that download failed.
+    """
+    package_names = list(dict.fromkeys(package_names))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(package_names)))) as executor:
+        futures = {name: executor.submit(download_package, name, version) for name in package_names}
+    return {name: future.result() for name, future in futures.items()}
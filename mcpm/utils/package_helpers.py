@@ -2,35 +2,379 @@
 Helper functions for package operations.
 """
 import os
-import json
+import re
+import contextlib
+import functools
+import fnmatch
+import shlex
 import click
 import zipfile
 import shutil
 import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from mcpm.config.constants import INSTALL_DIR
-from mcpm.database.local_db import add_package_to_local_db, remove_package_from_local_db, store_package_input_values
+from mcpm import _json
+from mcpm.config.constants import INSTALL_DIR, REQUIRED_PACKAGE_FIELDS
+from mcpm.database.local_db import add_package_to_local_db, remove_package_from_local_db, store_package_input_values, transaction
+
+@functools.lru_cache(maxsize=128)
+def _load_package_metadata_cached(path_str, mtime_ns, size):
+    """Parses an mcp_package.json file; memoized on its path, mtime and size."""
+    with open(path_str, 'rb') as f:
+        return _json.loads(f.read())
+
+def invalidate_package_metadata_cache():
+    """Forgets every memoized mcp_package.json parse (e.g. after removing a package)."""
+    _load_package_metadata_cached.cache_clear()
+
+def load_package_metadata(metadata_path):
+    """
+    Loads and parses a package's mcp_package.json.
+    
+    Parses are memoized per invocation and keyed on (path, st_mtime_ns, st_size), so an
+    edited file is re-read automatically. The returned dict is shared between callers
+    and must not be mutated.
+    
+    Raises:
+        OSError (FileNotFoundError if the file is missing) or _json.JSONDecodeError.
+    """
+    st = os.stat(metadata_path)
+    return _load_package_metadata_cached(str(metadata_path), st.st_mtime_ns, st.st_size)
+
+# Step lists in mcp_package.json; every step must be {"type": "shell", "command": "..."}
+_STEP_KEYS = ("install_steps", "uninstall_steps")
+
+def validate_package_steps(metadata):
+    """
+    Checks the structure of a package's install_steps and uninstall_steps.
+    
+    Args:
+        metadata: Parsed mcp_package.json.
+        
+    Returns:
+        An error message for the first malformed step, or None if all steps are valid.
+    """
+    for steps_key in _STEP_KEYS:
+        steps = metadata.get(steps_key, [])
+        if not isinstance(steps, list):
+            return f"{steps_key} must be a list"
+        for idx, step in enumerate(steps, 1):
+            if type(step) is not dict or step.get("type") != "shell" or type(step.get("command")) is not str:
+                return f"{steps_key} step {idx} must have type \"shell\" and a string command"
+    return None
+
+def validate_package_metadata(metadata):
+    """
+    Validates a parsed mcp_package.json: required fields, then step structure.
+    
+    Shared by create and publish so both reject the same packages.
+    
+    Args:
+        metadata: Parsed mcp_package.json.
+        
+    Returns:
+        An error message describing the first problem found, or None if valid.
+    """
+    if not isinstance(metadata, dict):
+        return "mcp_package.json must contain a JSON object"
+    missing_fields = [field for field in REQUIRED_PACKAGE_FIELDS if field not in metadata]
+    if missing_fields:
+        return f"mcp_package.json is missing required fields: {', '.join(missing_fields)}"
+    steps_error = validate_package_steps(metadata)
+    if steps_error:
+        return f"mcp_package.json: {steps_error}"
+    return None
 
 def get_installed_packages():
     """Lists locally installed packages."""
-    if not INSTALL_DIR.exists():
+    # DirEntry.is_dir() answers from the directory listing, without a stat per entry;
+    # hidden entries (e.g. trash awaiting deletion) are not packages
+    try:
+        with os.scandir(INSTALL_DIR) as entries:
+            return [entry.name for entry in entries if entry.is_dir() and not entry.name.startswith(".")]
+    except FileNotFoundError:
         return []
-    return [d.name for d in INSTALL_DIR.iterdir() if d.is_dir()]
 
-def install_package_from_zip(zip_path, package_name):
-    """Installs a package from a downloaded zip file, supporting install_inputs for user config."""
-    target_install_path = INSTALL_DIR / package_name
+def fast_rmtree(path, workers=8):
+    """
+    Removes a directory tree, unlinking files across a small thread pool.
+    
+    File removal is syscall-bound, so issuing unlinks concurrently helps with large
+    (e.g. node_modules-style) trees. Directories are then removed bottom-up. If the
+    parallel pass fails with an OSError, shutil.rmtree finishes the job (and raises
+    as it always has).
+    
+    Args:
+        path: Directory to remove.
+        workers: Number of threads issuing unlinks.
+    
+    Raises:
+        OSError if path is a symbolic link (like shutil.rmtree, the link's target is
+        never touched) or the tree cannot be removed.
+    """
+    # os.walk would follow a top-level link and empty its target
+    if os.path.islink(path):
+        raise OSError(f"Cannot call rmtree on a symbolic link: '{path}'")
+    try:
+        walk = list(os.walk(path, topdown=False))
+        if not walk:
+            raise FileNotFoundError(f"No such directory: '{path}'")
+        files = [os.path.join(root, name) for root, dirs, names in walk for name in names]
+        # Symlinks to directories are listed in dirs, but are removed like files
+        files.extend(os.path.join(root, name) for root, dirs, _ in walk for name in dirs if os.path.islink(os.path.join(root, name)))
+        if len(files) > workers:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(os.unlink, files, chunksize=64))
+        else:
+            for file_path in files:
+                os.unlink(file_path)
+        # os.walk(topdown=False) yields children before their parents
+        for root, _, _ in walk:
+            os.rmdir(root)
+    except OSError:
+        shutil.rmtree(path)
+
+# Name prefix of package directories that have been moved aside for deletion
+_TRASH_PREFIX = ".trash-"
+
+def _empty_trash(directory):
+    """Deletes every trash entry in directory, including ones left by interrupted runs (best-effort)."""
+    try:
+        with os.scandir(directory) as entries:
+            # Only real directories; a symlink's target must never be emptied
+            trash_paths = [entry.path for entry in entries
+                           if entry.name.startswith(_TRASH_PREFIX) and entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    for trash_path in trash_paths:
+        try:
+            fast_rmtree(trash_path)
+        except OSError:
+            pass  # Another run may be deleting it; otherwise it is retried next time
+
+def remove_package_directory(path):
+    """
+    Removes an installed package directory, returning as soon as it is out of place.
+    
+    The directory is renamed to a hidden trash entry beside it, and the trash is
+    deleted on a background thread. The interpreter waits for that thread before
+    exiting; anything an interrupted run leaves behind is swept on the next removal.
+    If the rename fails (e.g. EXDEV), the directory is deleted synchronously instead.
+    A package directory that is a symbolic link (e.g. to a development checkout) is
+    removed by unlinking the link; its target is left untouched.
+    
+    Raises:
+        OSError if the directory cannot be removed (FileNotFoundError if it is missing).
+    """
+    path = Path(path)
+    if path.is_symlink():
+        os.unlink(path)
+        return
+    trash_path = path.with_name(f"{_TRASH_PREFIX}{path.name}-{uuid.uuid4().hex}")
+    try:
+        os.rename(path, trash_path)
+    except OSError:
+        fast_rmtree(path)
+        return
+    threading.Thread(target=_empty_trash, args=(path.parent,), name="mcpm-empty-trash").start()
+
+# Shell syntax in a step command; commands without any of it are run without a shell
+_SHELL_SYNTAX = re.compile(r'[|&;<>()$`\\*?\[\]{}~#\n]')
+
+def _popen_step_command(command, cwd, **popen_kwargs):
+    """
+    Starts an install/uninstall step command in cwd.
+    
+    Plain commands are split with shlex and executed directly, skipping the /bin/sh
+    fork. Commands that use shell syntax (including # comments), start with a variable
+    assignment, or that can't be executed directly (no such executable, e.g. a shell
+    builtin; no permission; a script without a shebang) run through the shell as
+    before, so they behave and fail the way the shell always handled them (exit
+    status 127/126 rather than an exception).
+    
+    Returns:
+        The subprocess.Popen, started with popen_kwargs.
+    """
+    if not _SHELL_SYNTAX.search(command):
+        try:
+            args = shlex.split(command)
+        except ValueError:
+            args = None
+        if args and '=' not in args[0]:
+            try:
+                return subprocess.Popen(args, cwd=cwd, **popen_kwargs)
+            except OSError:
+                pass  # Not directly executable (or cwd is missing); let the shell decide
+    return subprocess.Popen(command, shell=True, cwd=cwd, **popen_kwargs)
+
+def run_step_command(command, cwd, capture=True):
+    """
+    Runs an install/uninstall step command in cwd (see _popen_step_command).
+    
+    Args:
+        command: The step's command line.
+        cwd: Directory to run it in.
+        capture: Collect stdout/stderr. When False the command writes straight to
+            the terminal, so long build logs scroll by as they are produced instead
+            of being held in memory until the step ends.
+    
+    Returns:
+        The subprocess.CompletedProcess (text mode; stdout/stderr are None when not
+        captured).
+    """
+    pipe = subprocess.PIPE if capture else None
+    with _popen_step_command(command, cwd, stdout=pipe, stderr=pipe, text=True) as proc:
+        stdout, stderr = proc.communicate()
+    return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+def _group_install_steps(steps):
+    """
+    Splits install steps into the groups they run in.
+    
+    Consecutive steps that declare the same "parallel_group" form one group and run
+    concurrently; every other step is a group of its own, so packages that don't use
+    parallel_group keep running serially.
+    
+    Returns:
+        A list of groups, each a list of (step number, step) tuples.
+    """
+    groups = []
+    previous_key = None
+    for idx, step in enumerate(steps, 1):
+        group_key = step.get("parallel_group") if isinstance(step, dict) else None
+        if group_key is not None and group_key == previous_key:
+            groups[-1].append((idx, step))
+        else:
+            groups.append([(idx, step)])
+        previous_key = group_key
+    return groups
+
+def _discard_package_archive(zip_source):
+    """Closes a downloaded archive file object, or deletes an archive given by path."""
+    if hasattr(zip_source, "read"):
+        zip_source.close()
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(zip_source)
+
+# Copy size used when extracting archive members
+_EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+def _archive_member_path(target_dir, filename):
+    """
+    Maps an archive member name to its path under target_dir.
+    
+    Like ZipFile.extract, absolute paths, drive letters and '.'/'..' components are
+    dropped, so no member can be written outside target_dir.
+    
+    Returns:
+        The destination path (str), or None if nothing of the name is left.
+    """
+    filename = filename.replace('\\', '/')
+    parts = [part for part in filename.split('/') if part not in ('', '.', '..')]
+    if parts:
+        parts[0] = os.path.splitdrive(parts[0])[1]
+    parts = [part for part in parts if part]
+    if not parts:
+        return None
+    return os.path.join(target_dir, *parts)
+
+# Archives with more members than this are extracted on a thread pool
+_PARALLEL_EXTRACT_MIN_MEMBERS = 32
+
+def _extract_member(zip_ref, info, dest, zip_lock):
+    """Copies one archive member to dest and restores its Unix permission bits."""
+    # ZipFile serializes reads of the shared file itself, but not the open/close
+    # bookkeeping, so those are done under zip_lock
+    with zip_lock:
+        src = zip_ref.open(info)
     try:
-        if target_install_path.exists():
-            click.echo(f"Package {package_name} already exists. Removing existing version.")
-            shutil.rmtree(target_install_path)
+        with open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst, _EXTRACT_CHUNK_SIZE)
+    finally:
+        with zip_lock:
+            src.close()
+    mode = (info.external_attr >> 16) & 0o777
+    if mode:
+        os.chmod(dest, mode)
 
-        click.echo(f"Installing {package_name} to {target_install_path}...")
+def _extract_package_archive(zip_ref, target_dir):
+    """
+    Extracts every member of an open package archive into target_dir.
+    
+    Members are copied in 1 MiB chunks and each directory (with its ancestors) is
+    created once, instead of extractall's per-member makedirs and small default-buffer copies. Unix
+    permission bits recorded in the archive (e.g. executable scripts) are restored.
+    Archives with many members are extracted on a small thread pool (zlib releases
+    the GIL while inflating); all directories are created up front so workers never
+    race on mkdir.
+    """
+    target_dir = str(target_dir)
+    created_dirs = set()
+    members = []
+    for info in zip_ref.infolist():
+        dest = _archive_member_path(target_dir, info.filename)
+        if dest is None:
+            continue
+        directory = dest if info.is_dir() else os.path.dirname(dest)
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            # makedirs created every ancestor too; remember them so a later member
+            # in a parent directory doesn't stat the chain again
+            while directory not in created_dirs:
+                created_dirs.add(directory)
+                if directory == target_dir:
+                    break
+                directory = os.path.dirname(directory)
+        if not info.is_dir():
+            members.append((info, dest))
+    
+    zip_lock = threading.Lock()
+    workers = min(8, os.cpu_count() or 1)
+    if len(members) > _PARALLEL_EXTRACT_MIN_MEMBERS and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Materialize the results so a failed member raises here
+            list(executor.map(lambda member: _extract_member(zip_ref, member[0], member[1], zip_lock), members))
+    else:
+        for info, dest in members:
+            _extract_member(zip_ref, info, dest, zip_lock)
+
+def _record_installed_package(row, pending_db_rows):
+    """Writes an installed_packages row now, or queues it on pending_db_rows if given."""
+    if pending_db_rows is None:
+        add_package_to_local_db(*row)
+    else:
+        pending_db_rows.append(row)
+
+def install_package_from_zip(zip_path, package_name, pending_db_rows=None):
+    """Installs a package from a downloaded zip file, supporting install_inputs for user config.
+    
+    Args:
+        zip_path: Path of the package archive, or a readable file object holding it
+            (as returned by download_package). Either is discarded after extraction.
+        package_name: Name of the directory to install the package into.
+        pending_db_rows: Optional list. When given, the package's installed_packages
+            row is appended to it instead of being written, so a caller installing
+            several packages can record them in one add_packages_to_local_db call.
+    """
+    target_install_path = INSTALL_DIR / package_name
+    try:
+        # Opening the archive reads its end-of-central-directory record and central
+        # directory (from the tail of the file only), so a truncated or corrupt
+        # download fails here, before the existing version is touched
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(target_install_path)
+            if target_install_path.exists():
+                click.echo(f"Package {package_name} already exists. Removing existing version.")
+                # Renamed out of the way and deleted in the background, overlapping with extraction
+                remove_package_directory(target_install_path)
+
+            click.echo(f"Installing {package_name} to {target_install_path}...")
+            _extract_package_archive(zip_ref, target_install_path)
 
-        os.remove(zip_path)
+        _discard_package_archive(zip_path)
         click.echo(f"Successfully installed {package_name}.")
 
         # --- Support install_inputs for user config ---
@@ -38,8 +382,7 @@ def install_package_from_zip(zip_path, package_name):
         install_inputs_values = {}
         if metadata_path.exists():
             try:
-                with open(metadata_path, "r") as f:
-                    metadata = json.load(f)
+                metadata = load_package_metadata(metadata_path)
                 install_inputs = metadata.get("install_inputs", [])
                 for input_spec in install_inputs:
                     prompt_text = input_spec.get("prompt") or f"Enter value for {input_spec['name']}"
@@ -50,36 +393,52 @@ def install_package_from_zip(zip_path, package_name):
                 install_steps = metadata.get("install_steps", [])
                 if install_steps:
                     click.echo(f"Running install steps for {package_name}...")
-                    original_cwd = os.getcwd()
+                    # The input names are fixed for the whole install, so every ${name}
+                    # reference is substituted by one compiled pattern in a single pass
+                    input_reference = re.compile(r"\$\{(" + "|".join(map(re.escape, install_inputs_values)) + r")\}") if install_inputs_values else None
                     try:
-                        os.chdir(target_install_path) # target_install_path is defined earlier
-                        click.echo(f"Changed directory to {target_install_path} for install steps.")
-                        for idx, step in enumerate(install_steps, 1):
-                            if step.get("type") == "shell" and "command" in step:
-                                command = step["command"]
-                                # Substitute variables in the command
-                                for var, val in install_inputs_values.items():
-                                    command = command.replace(f"${{{var}}}", val)
-                                click.echo(f"Step {idx}: {command}")
-                                if click.confirm(f"Do you want to run this command in {os.getcwd()}?", default=True):
-                                    process_result = subprocess.run(command, shell=True, capture_output=True, text=True)
-                                    if process_result.stdout:
-                                        click.echo(f"Output:\n{process_result.stdout.strip()}")
-                                    if process_result.stderr:
-                                        click.echo(f"Error output:\n{process_result.stderr.strip()}", err=True)
-                                    if process_result.returncode != 0:
-                                        click.echo(f"Warning: Command '{command}' exited with code {process_result.returncode}", err=True)
+                        for step_group in _group_install_steps(install_steps):
+                            # Confirm every step of the group up front, then run the approved ones
+                            approved_commands = []
+                            capture_flags = []
+                            for idx, step in step_group:
+                                if step.get("type") == "shell" and "command" in step:
+                                    command = step["command"]
+                                    # Substitute variables in the command
+                                    if input_reference:
+                                        command = input_reference.sub(lambda match: install_inputs_values[match.group(1)], command)
+                                    click.echo(f"Step {idx}: {command}")
+                                    if click.confirm(f"Do you want to run this command in {target_install_path}?", default=True):
+                                        approved_commands.append(command)
+                                        capture_flags.append(bool(step.get("capture", False)))
+                                    else:
+                                        click.echo("Skipped this step.")
                                 else:
-                                    click.echo("Skipped this step.")
+                                    click.echo(f"Unknown or unsupported step type: {step}", err=True)
+                            
+                            if len(approved_commands) > 1:
+                                # The steps mostly wait on their child processes (often on the network),
+                                # so each step of the group gets its own thread. Their output is always
+                                # captured, so concurrent steps never interleave on the terminal
+                                with ThreadPoolExecutor(max_workers=len(approved_commands)) as executor:
+                                    process_results = list(executor.map(lambda command: run_step_command(command, target_install_path), approved_commands))
                             else:
-                                click.echo(f"Unknown or unsupported step type: {step}", err=True)
+                                # A lone step streams to the terminal unless it asks for "capture": true
+                                process_results = [run_step_command(command, target_install_path, capture=capture)
+                                                   for command, capture in zip(approved_commands, capture_flags)]
+                            
+                            # Report captured output in step order
+                            for command, process_result in zip(approved_commands, process_results):
+                                if process_result.stdout:
+                                    click.echo(f"Output:\n{process_result.stdout.strip()}")
+                                if process_result.stderr:
+                                    click.echo(f"Error output:\n{process_result.stderr.strip()}", err=True)
+                                if process_result.returncode != 0:
+                                    click.echo(f"Warning: Command '{command}' exited with code {process_result.returncode}", err=True)
                     except FileNotFoundError:
                         click.echo(f"Error: Package directory {target_install_path} not found for running install steps.", err=True)
-                    except Exception as e_chdir:
-                        click.echo(f"Error changing directory or running install steps: {e_chdir}", err=True)
-                    finally:
-                        os.chdir(original_cwd)
-                        click.echo(f"Restored directory to {original_cwd}.")
+                    except Exception as e_run:
+                        click.echo(f"Error running install steps: {e_run}", err=True)
                 else:
                     click.echo("No install steps defined in mcp_package.json.")
                 
@@ -87,69 +446,215 @@ def install_package_from_zip(zip_path, package_name):
                 install_name = metadata.get("install_name", package_name)
                 version = metadata.get("version", "0.0.1")
                 
-                # Store input values in the database for later use
-                store_package_input_values(install_name, install_inputs_values)
-                
-                # Add to local database
-                add_package_to_local_db(install_name, version, str(target_install_path))
+                # Store input values and add to local database, committed together
+                with transaction():
+                    store_package_input_values(install_name, install_inputs_values)
+                    _record_installed_package((install_name, version, str(target_install_path)), pending_db_rows)
                 
             except Exception as e:
                 click.echo(f"Error reading install_steps from mcp_package.json: {e}", err=True)
         else:
             click.echo("No mcp_package.json found in the installed package directory.")
             # Add to local database with default values
-            add_package_to_local_db(package_name, "N/A", str(target_install_path))
+            _record_installed_package((package_name, "N/A", str(target_install_path)), pending_db_rows)
             
         return True, install_inputs_values
     except zipfile.BadZipFile:
-        click.echo(f"Error: Downloaded file {zip_path} is not a valid zip file.", err=True)
-        if os.path.exists(zip_path): os.remove(zip_path)
+        click.echo(f"Error: Downloaded archive for {package_name} is not a valid zip file.", err=True)
+        _discard_package_archive(zip_path)
         return False, {}
     except Exception as e:
         click.echo(f"Error installing package {package_name}: {e}", err=True)
-        if os.path.exists(zip_path): os.remove(zip_path)
+        _discard_package_archive(zip_path)
         return False, {}
 
-def create_package_archive(output_filename, source_dir='.'):
-    """Creates a zip archive of the source directory."""
+def _gitignore_pattern_to_regex(pattern):
+    """Translates one .gitignore pattern (without a trailing slash) to a regex over relative POSIX paths."""
+    # A slash anywhere but at the end anchors the pattern to the source root
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.*')
+            i += 3
+        elif pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            parts.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            char_class = pattern[i + 1:end]
+            if char_class.startswith('!'):
+                char_class = '^' + char_class[1:]
+            parts.append(f'[{char_class}]')
+            i = end + 1
+        else:
+            if pattern[i] == '\\' and i + 1 < len(pattern):
+                i += 1
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return ('' if anchored else '(?:.*/)?') + ''.join(parts)
+
+def _load_gitignore(source_path):
+    """
+    Compiles the .gitignore at the root of source_path, if there is one.
+    
+    Supports the common subset of gitignore syntax: comments, '*', '?', '**',
+    character classes, anchoring with '/' and directory-only patterns ending in '/'.
+    Negated ('!') patterns are not supported and are skipped.
+    
+    Returns:
+        A (dir_regex, file_regex) tuple of compiled regexes matched against relative
+        POSIX paths (either may be None), or (None, None) without a .gitignore.
+    """
+    try:
+        with open(os.path.join(source_path, '.gitignore'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None, None
+    
+    dir_patterns, file_patterns = [], []
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith('#') or line.startswith('!'):
+            continue
+        if line.endswith('/'):
+            dir_patterns.append(_gitignore_pattern_to_regex(line.rstrip('/')))
+        else:
+            # Patterns without a trailing slash match files and directories alike
+            regex = _gitignore_pattern_to_regex(line)
+            dir_patterns.append(regex)
+            file_patterns.append(regex)
+    
+    def _compile(patterns):
+        return re.compile('(?:' + '|'.join(patterns) + r')\Z') if patterns else None
+    return _compile(dir_patterns), _compile(file_patterns)
+
+# Already-compressed file types; deflating them again costs CPU for next to no saving
+_STORED_SUFFIXES = frozenset((
+    '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.whl', '.jar', '.egg',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2',
+    '.mp3', '.mp4', '.pdf',
+))
+
+# Verbose archive listing is written in batches of this many lines
+_VERBOSE_FLUSH_LINES = 64
+
+def create_package_archive(output_filename, source_dir='.', compresslevel=1, verbose=False, compression=zipfile.ZIP_DEFLATED):
+    """Creates a zip archive of the source directory.
+    
+    Args:
+        output_filename: Path of the archive to create.
+        source_dir: Directory whose contents are archived.
+        compresslevel: zlib level (0-9) used for deflated members. Level 1 is several
+            times faster than zlib's default of 6 for a modestly larger archive.
+            Already-compressed file types (images, archives, fonts) are stored as-is.
+        verbose: List every added and excluded path (written in batches of
+            _VERBOSE_FLUSH_LINES lines) instead of only the totals.
+        compression: zipfile compression method for the members (ZIP_DEFLATED or
+            ZIP_STORED).
+    
+    Paths matched by a .gitignore at the root of source_dir are excluded as well.
+    """
     source_path = Path(source_dir).resolve()
     exclude_patterns = ['.git', '__pycache__', '*.pyc', '.DS_Store', output_filename, '.venv', 'venv', '*.zip', '*.mcpz']
+    # Compile the excludes once: exact names for a set lookup, globs into a single regex
+    literal_excludes = frozenset(pattern for pattern in exclude_patterns if '*' not in pattern)
+    glob_excludes = re.compile('|'.join(fnmatch.translate(pattern) for pattern in exclude_patterns if '*' in pattern))
+    gitignore_dirs, gitignore_files = _load_gitignore(source_path)
 
     click.echo(f"Creating archive {output_filename} from {source_path}...")
+    n_added = n_excluded = 0
+    verbose_lines = []
+
+    def log_verbose(line):
+        # Buffered so a large tree costs one write per batch, not one per path
+        verbose_lines.append(line)
+        if len(verbose_lines) >= _VERBOSE_FLUSH_LINES:
+            click.echo("\n".join(verbose_lines))
+            verbose_lines.clear()
     try:
-        with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for item in source_path.rglob('*'):
-                # Calculate relative path for storage inside zip
-                relative_path = item.relative_to(source_path)
-
-                # Check against exclude patterns
-                if any(part in exclude_patterns for part in relative_path.parts) or \
-                   any(item.match(pattern) for pattern in exclude_patterns if '*' in pattern) or \
-                   item.name in exclude_patterns:
-                    click.echo(f"  Excluding: {relative_path}")
-                    continue
-
-                if item.is_file():
-                    click.echo(f"  Adding: {relative_path}")
-                    zipf.write(item, arcname=relative_path)
-                # Add empty directories if needed (often not required if files exist within)
-                # elif item.is_dir() and not any(item.iterdir()):
-                #    zipf.write(item, arcname=relative_path)
+        with zipfile.ZipFile(output_filename, 'w', compression, compresslevel=compresslevel) as zipf:
+            # Walk with os.scandir: DirEntry answers is_dir()/is_file() from the listing,
+            # and excluded directories (.git, .venv, ...) are pruned without descending.
+            # Symlinked directories are not descended into (as with rglob), so a link
+            # cycle can't recurse; symlinked files are archived by content
+            pending_dirs = [(str(source_path), "")]
+            while pending_dirs:
+                dir_path, relative_dir = pending_dirs.pop()
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        # Relative path for storage inside zip
+                        relative_path = relative_dir + entry.name
+
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name in literal_excludes or (gitignore_dirs and gitignore_dirs.match(relative_path)):
+                                n_excluded += 1
+                                if verbose:
+                                    log_verbose(f"  Excluding: {relative_path}/")
+                            else:
+                                pending_dirs.append((entry.path, relative_path + "/"))
+                            continue
+
+                        # Only files are written (empty directories could be added here if ever needed)
+                        if not entry.is_file():
+                            continue
+
+                        # Check against exclude patterns
+                        if (entry.name in literal_excludes or glob_excludes.match(entry.name)
+                                or (gitignore_files and gitignore_files.match(relative_path))):
+                            n_excluded += 1
+                            if verbose:
+                                log_verbose(f"  Excluding: {relative_path}")
+                            continue
 
+                        n_added += 1
+                        if verbose:
+                            log_verbose(f"  Adding: {relative_path}")
+                        compress_type = zipfile.ZIP_STORED if os.path.splitext(entry.name)[1].lower() in _STORED_SUFFIXES else None
+                        zipf.write(entry.path, arcname=relative_path, compress_type=compress_type)
+
+        if verbose_lines:
+            click.echo("\n".join(verbose_lines))
+        click.echo(f"Added {n_added} files, excluded {n_excluded}")
         click.echo(f"Successfully created package: {output_filename}")
         return True
     except Exception as e:
         click.echo(f"Error creating package archive: {e}", err=True)
         # Clean up incomplete zip file if it exists
-        if Path(output_filename).exists():
+        with contextlib.suppress(FileNotFoundError):
             os.remove(output_filename)
         return False
 
+# Name index of the last registry package list looked up: (list, {name: package data}).
+# The list itself is held, so its identity can't be reused by another object
+_package_index = (None, {})
+
 def _get_package_data_by_name(package_name, all_packages_data):
-    """Finds and returns the full data dictionary for a package by its name."""
+    """
+    Finds and returns the full data dictionary for a package by its name.
+    
+    The name index is built once per registry listing, so repeated lookups (e.g.
+    opening details views in the interactive list) don't rescan every package.
+    """
+    global _package_index
     if not all_packages_data:
         return None
-    for pkg_data in all_packages_data:
-        if pkg_data.get("name") == package_name:
-            return pkg_data
-    return None
+    indexed_packages, index = _package_index
+    if indexed_packages is not all_packages_data:
+        index = {}
+        for pkg_data in all_packages_data:
+            # The first package with a given name wins, as with a linear scan
+            index.setdefault(pkg_data.get("name"), pkg_data)
+        _package_index = (all_packages_data, index)
+    return index.get(package_name)
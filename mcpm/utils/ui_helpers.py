@@ -2,13 +2,52 @@
 Helper functions for interactive UI components.
 """
 import click
+import functools
 import webbrowser
-import questionary
-import json
 from pathlib import Path
 
-from mcpm.utils.package_helpers import _get_package_data_by_name
+from mcpm import _json
+from mcpm.utils.package_helpers import _get_package_data_by_name, load_package_metadata
 from mcpm.config.constants import INSTALL_DIR
+from mcpm.config.manager import get_target_config_path, dispatch_config_action
+
+# Command modules (list, configure) import this module, so commands are imported on first
+# use; the getters cache them so later selections skip the import machinery
+@functools.lru_cache(maxsize=None)
+def _get_install_command():
+    from mcpm.commands.install import install_command_func
+    return install_command_func
+
+@functools.lru_cache(maxsize=None)
+def _get_uninstall_command():
+    from mcpm.commands.uninstall import uninstall_command_func
+    return uninstall_command_func
+
+@functools.lru_cache(maxsize=None)
+def _get_configure_command():
+    from mcpm.commands.configure import configure_command_func
+    return configure_command_func
+
+@functools.lru_cache(maxsize=None)
+def _static_action_choices():
+    """
+    Builds the details view's fixed action choices once, on first use.
+    
+    Returns:
+        (manage, install, navigation) tuples of questionary Choices: uninstall and
+        configure for installed packages, install otherwise, and back/exit.
+    """
+    import questionary
+    manage = (
+        questionary.Choice(title="📦 Uninstall this package", value="uninstall"),
+        questionary.Choice(title="⚙️  Configure for IDE", value="configure"),
+    )
+    install = (questionary.Choice(title="📦 Install this package", value="install"),)
+    navigation = (
+        questionary.Choice(title="⬅️  Back to list", value="back"),
+        questionary.Choice(title="❌ Exit", value="exit"),
+    )
+    return manage, install, navigation
 
 def _display_package_details_interactive(package_name, all_packages_data, installed_packages_info, ctx):
     """
@@ -24,6 +63,8 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
     Returns:
         A status string: 'back_to_list', 'state_changed', 'exit_mcpm', or 'details_refresh'.
     """
+    import questionary
+    
     # Get full package data
     pkg_data = _get_package_data_by_name(package_name, all_packages_data)
     
@@ -31,13 +72,12 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
         # Check if it's a local-only package
         if package_name in installed_packages_info:
             # Display local-only package details
-            pkg_path = installed_packages_info[package_name].get('install_path', 'Unknown')
-            pkg_version = installed_packages_info[package_name].get('version', 'Unknown')
-            installed_date = installed_packages_info[package_name].get('installed_at', 'Unknown')
+            info_get = installed_packages_info[package_name].get
+            pkg_path = info_get('install_path', 'Unknown')
+            pkg_version = info_get('version', 'Unknown')
+            installed_date = info_get('installed_at', 'Unknown')
             
             click.clear()
-            click.echo("Package Details:")
-            click.echo(f"Name:        {package_name}")
             
             # Check for mcp_package.json to get more details
             metadata_path = Path(pkg_path) / "mcp_package.json"
@@ -48,54 +88,56 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
             source_url = ""
             homepage = ""
             
-            if metadata_path.exists():
-                try:
-                    with open(metadata_path, "r") as f:
-                        metadata = json.load(f)
-                    
-                    # Extract metadata if available
-                    if "description" in metadata:
-                        description = metadata['description']
-                    if "author" in metadata:
-                        author = metadata['author']
-                    if "license" in metadata:
-                        license_info = metadata['license']
-                    if "runtime" in metadata:
-                        runtime = metadata['runtime']
-                    if "source_url" in metadata:
-                        source_url = metadata['source_url']
-                    if "homepage" in metadata:
-                        homepage = metadata['homepage']
-                except Exception as e:
-                    click.echo(f"Error reading package metadata: {e}", err=True)
-            
-            click.echo(f"Description: {description}")
+            try:
+                # Memoized on (path, mtime, size), so re-entering details doesn't re-parse
+                metadata = load_package_metadata(metadata_path)
+                
+                # Extract metadata if available
+                if "description" in metadata:
+                    description = metadata['description']
+                if "author" in metadata:
+                    author = metadata['author']
+                if "license" in metadata:
+                    license_info = metadata['license']
+                if "runtime" in metadata:
+                    runtime = metadata['runtime']
+                if "source_url" in metadata:
+                    source_url = metadata['source_url']
+                if "homepage" in metadata:
+                    homepage = metadata['homepage']
+            except FileNotFoundError:
+                pass  # No mcp_package.json, keep the defaults
+            except Exception as e:
+                click.echo(f"Error reading package metadata: {e}", err=True)
             
             vendor_info = author
             if homepage and not homepage.startswith("http"):
                 vendor_info += f" ({homepage})"
-            click.echo(f"Vendor:      {vendor_info}")
-            
-            click.echo(f"License:     {license_info}")
-            click.echo(f"Runtime:     {runtime}")
             
+            # Render the details card in one write
+            lines = [
+                "Package Details:",
+                f"Name:        {package_name}",
+                f"Description: {description}",
+                f"Vendor:      {vendor_info}",
+                f"License:     {license_info}",
+                f"Runtime:     {runtime}",
+            ]
             if source_url:
-                click.echo(f"Source:      {source_url}")
+                lines.append(f"Source:      {source_url}")
             if homepage and homepage.startswith("http"):
-                click.echo(f"Homepage:    {homepage}")
-                
-            click.echo(f"Status:      Installed (Local only)")
-            click.echo(f"Version:     {pkg_version}")
-            click.echo(f"Path:        {pkg_path}")
-            click.echo(f"Installed:   {installed_date}")
+                lines.append(f"Homepage:    {homepage}")
+            lines.extend([
+                "Status:      Installed (Local only)",
+                f"Version:     {pkg_version}",
+                f"Path:        {pkg_path}",
+                f"Installed:   {installed_date}",
+            ])
+            click.echo("\n".join(lines))
             
             # Management options
-            actions = [
-                questionary.Choice(title="📦 Uninstall this package", value="uninstall"),
-                questionary.Choice(title="⚙️  Configure for IDE", value="configure"),
-                questionary.Choice(title="⬅️  Back to list", value="back"),
-                questionary.Choice(title="❌ Exit", value="exit")
-            ]
+            manage_actions, _, navigation_actions = _static_action_choices()
+            actions = [*manage_actions, *navigation_actions]
             
             action = questionary.select(
                 "Select an action:",
@@ -104,13 +146,11 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
             
             if action == "uninstall":
                 if click.confirm(f"Are you sure you want to uninstall {package_name}?", default=False):
-                    from mcpm.commands.uninstall import uninstall_command_func
-                    uninstall_command_func(package_name, None)
+                    _get_uninstall_command()(package_name, None)
                     return "state_changed"
             elif action == "configure":
                 # Invoke the configure command
-                from mcpm.commands.configure import configure_command_func
-                configure_command_func()
+                _get_configure_command()()
                 return "state_changed"
             elif action == "back":
                 return "back_to_list"
@@ -126,62 +166,59 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
     is_installed = package_name in installed_packages_info
     
     # Extract package details
-    pkg_name = pkg_data.get("name", "Unknown")
-    pkg_version = pkg_data.get("version", "Unknown")
-    pkg_description = pkg_data.get("description", "No description available")
-    pkg_author = pkg_data.get("author", "Unknown")
-    pkg_license = pkg_data.get("license", "Unknown")
-    pkg_runtime = pkg_data.get("runtime", "Unknown")
-    pkg_source_url = pkg_data.get("source_url", "")
-    pkg_homepage = pkg_data.get("homepage", "")
-    
-    # Display package details
-    click.clear()
-    click.echo("Package Details:")
-    click.echo(f"Name:        {pkg_name}")
-    click.echo(f"Description: {pkg_description}")
+    pkg_get = pkg_data.get
+    pkg_name = pkg_get("name", "Unknown")
+    pkg_version = pkg_get("version", "Unknown")
+    pkg_description = pkg_get("description", "No description available")
+    pkg_author = pkg_get("author", "Unknown")
+    pkg_license = pkg_get("license", "Unknown")
+    pkg_runtime = pkg_get("runtime", "Unknown")
+    pkg_source_url = pkg_get("source_url", "")
+    pkg_homepage = pkg_get("homepage", "")
     
     vendor_info = pkg_author
     if pkg_homepage and not pkg_homepage.startswith("http"):
         vendor_info += f" ({pkg_homepage})"
-    click.echo(f"Vendor:      {vendor_info}")
-    
-    click.echo(f"License:     {pkg_license}")
-    click.echo(f"Runtime:     {pkg_runtime}")
     
+    # Display package details in one write
+    lines = [
+        "Package Details:",
+        f"Name:        {pkg_name}",
+        f"Description: {pkg_description}",
+        f"Vendor:      {vendor_info}",
+        f"License:     {pkg_license}",
+        f"Runtime:     {pkg_runtime}",
+    ]
     if pkg_source_url:
-        click.echo(f"Source:      {pkg_source_url}")
+        lines.append(f"Source:      {pkg_source_url}")
     if pkg_homepage and pkg_homepage.startswith("http"):
-        click.echo(f"Homepage:    {pkg_homepage}")
-    
-    click.echo(f"Status:      {'Installed' if is_installed else 'Not installed'}")
+        lines.append(f"Homepage:    {pkg_homepage}")
+    lines.append(f"Status:      {'Installed' if is_installed else 'Not installed'}")
     
     if is_installed:
-        pkg_path = installed_packages_info[package_name].get('install_path', 'Unknown')
-        installed_version = installed_packages_info[package_name].get('version', 'Unknown')
-        installed_date = installed_packages_info[package_name].get('installed_at', 'Unknown')
-        click.echo(f"Version:     {installed_version}")
-        click.echo(f"Path:        {pkg_path}")
-        click.echo(f"Installed:   {installed_date}")
+        info_get = installed_packages_info[package_name].get
+        pkg_path = info_get('install_path', 'Unknown')
+        installed_version = info_get('version', 'Unknown')
+        installed_date = info_get('installed_at', 'Unknown')
+        lines.extend([
+            f"Version:     {installed_version}",
+            f"Path:        {pkg_path}",
+            f"Installed:   {installed_date}",
+        ])
     
-    # Management options
-    actions = []
+    click.clear()
+    click.echo("\n".join(lines))
     
-    if is_installed:
-        actions.append(questionary.Choice(title="📦 Uninstall this package", value="uninstall"))
-        actions.append(questionary.Choice(title="⚙️  Configure for IDE", value="configure"))
-    else:
-        actions.append(questionary.Choice(title="📦 Install this package", value="install"))
+    # Management options: only the URL choices depend on the package
+    manage_actions, install_actions, navigation_actions = _static_action_choices()
+    actions = list(manage_actions if is_installed else install_actions)
     
     if pkg_source_url:
         actions.append(questionary.Choice(title="🔗 Open source URL", value="source_url"))
     if pkg_homepage and pkg_homepage.startswith("http"):
         actions.append(questionary.Choice(title="🔗 Open homepage", value="homepage"))
     
-    actions.extend([
-        questionary.Choice(title="⬅️  Back to list", value="back"),
-        questionary.Choice(title="❌ Exit", value="exit")
-    ])
+    actions.extend(navigation_actions)
     
     action = questionary.select(
         "Select an action:",
@@ -189,18 +226,15 @@ def _display_package_details_interactive(package_name, all_packages_data, instal
     ).ask()
     
     if action == "install":
-        from mcpm.commands.install import install_command_func
-        install_command_func(package_name, None)
+        _get_install_command()(package_name, None)
         return "state_changed"
     elif action == "uninstall":
         if click.confirm(f"Are you sure you want to uninstall {package_name}?", default=False):
-            from mcpm.commands.uninstall import uninstall_command_func
-            uninstall_command_func(package_name, None)
+            _get_uninstall_command()(package_name, None)
             return "state_changed"
     elif action == "configure":
         # Invoke the configure command
-        from mcpm.commands.configure import configure_command_func
-        configure_command_func(package_name)
+        _get_configure_command()(package_name)
         return "state_changed"
     elif action == "source_url":
         click.echo(f"Opening source URL: {pkg_source_url}")
@@ -222,6 +256,8 @@ def _configure_specific_package(package_name, package_path):
         package_name: The name of the package to configure (install_name from DB).
         package_path: The installation path of the package.
     """
+    import questionary
+    
     if not package_path:
         click.echo(f"Error: Could not determine installation path for package '{package_name}'.", err=True)
         return
@@ -233,14 +269,12 @@ def _configure_specific_package(package_name, package_path):
     
     # Load mcp_package.json to get available IDEs for selection
     mcp_package_json_path = pkg_install_path / "mcp_package.json"
-    if not mcp_package_json_path.exists():
+    try:
+        package_metadata = load_package_metadata(mcp_package_json_path)
+    except FileNotFoundError:
         click.echo(f"Error: mcp_package.json not found at {mcp_package_json_path} for package '{package_name}'.", err=True)
         return
-    
-    try:
-        with open(mcp_package_json_path, 'r') as f:
-            package_metadata = json.load(f)
-    except json.JSONDecodeError:
+    except _json.JSONDecodeError:
         click.echo(f"Error: Could not parse {mcp_package_json_path}.", err=True)
         return
     except IOError as e:
@@ -291,8 +325,6 @@ def _configure_specific_package(package_name, package_path):
         return
     
     # Now we have package_name, target_ide, and action - process the configuration directly
-    from mcpm.config.manager import get_target_config_path, update_mcp_config_file_for_configure, remove_server_from_mcp_config
-    
     # Get the target configuration file path
     config_path = get_target_config_path(target_ide)
     if not config_path:
@@ -309,18 +341,5 @@ def _configure_specific_package(package_name, package_path):
     from mcpm.database.local_db import get_package_input_values
     input_values = get_package_input_values(install_name)
     
-    # Process the action
-    if action == "add":
-        # Update the configuration
-        if update_mcp_config_file_for_configure(config_path, install_name, ide_config, pkg_install_path, input_values):
-            click.echo(f"Successfully configured {package_name} for {target_ide}.")
-        else:
-            click.echo(f"Failed to configure {package_name} for {target_ide}.", err=True)
-    elif action == "remove":
-        # Remove the configuration
-        if remove_server_from_mcp_config(config_path, install_name):
-            click.echo(f"Successfully removed {package_name} configuration from {target_ide}.")
-        else:
-            click.echo(f"Failed to remove {package_name} configuration from {target_ide}.", err=True)
-    else:
-        click.echo(f"Error: Unknown action '{action}'. Must be 'add' or 'remove'.", err=True)
+    # Process the action through the shared add/remove dispatch table
+    dispatch_config_action(action, package_name, target_ide, config_path, install_name, ide_config, pkg_install_path, input_values)
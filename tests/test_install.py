@@ -0,0 +1,27 @@
+"""
+Tests for the install command.
+"""
+import unittest
+from unittest import mock
+
+from mcpm.commands import install
+
+
+class InstallPackagesTest(unittest.TestCase):
+    def test_rows_are_recorded_when_a_later_install_is_aborted(self):
+        def fake_install(package_file, package_name, pending_db_rows):
+            if package_name == "second":
+                raise KeyboardInterrupt
+            pending_db_rows.append((package_name, "1.0.0", f"/packages/{package_name}"))
+            return True, {}
+
+        with mock.patch.object(install, "download_packages", return_value={"first": object(), "second": object()}), \
+                mock.patch.object(install, "install_package_from_zip", side_effect=fake_install), \
+                mock.patch.object(install, "add_packages_to_local_db") as add_rows:
+            with self.assertRaises(KeyboardInterrupt):
+                install.install_packages_command_func(["first", "second"])
+        add_rows.assert_called_once_with([("first", "1.0.0", "/packages/first")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Tests for the local SQLite database helpers.
+"""
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from mcpm.database import local_db
+
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        db_dir = Path(tmp.name)
+        patches = [
+            mock.patch.object(local_db, "LOCAL_DB_DIR", db_dir),
+            mock.patch.object(local_db, "LOCAL_DB_PATH", db_dir / "local_registry.db"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        local_db._open_local_db_connection.cache_clear()
+        self.addCleanup(self._close_connection)
+
+    def _close_connection(self):
+        conn = local_db._get_local_db_connection()
+        if conn:
+            conn.close()
+        local_db._open_local_db_connection.cache_clear()
+
+    def test_write_from_another_thread_does_not_commit_an_open_transaction(self):
+        writer = threading.Thread(target=local_db.store_registry_response, args=("http://registry/packages", b"[]"))
+        with self.assertRaises(RuntimeError):
+            with local_db.transaction():
+                local_db.add_package_to_local_db("demo", "1.0.0", "/packages/demo")
+                writer.start()
+                writer.join(timeout=0.2)
+                # The other thread's write waits for this transaction to finish
+                self.assertTrue(writer.is_alive())
+                raise RuntimeError("abort")
+        writer.join()
+
+        self.assertFalse(local_db.is_package_installed("demo"))
+        self.assertIsNotNone(local_db.get_registry_cache_entry("http://registry/packages"))
+
+    def test_nested_blocks_commit_once(self):
+        with local_db.transaction():
+            with local_db.transaction():
+                local_db.add_package_to_local_db("demo", "1.0.0", "/packages/demo")
+            self.assertTrue(local_db._get_local_db_connection().in_transaction)
+        self.assertFalse(local_db._get_local_db_connection().in_transaction)
+        self.assertTrue(local_db.is_package_installed("demo"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""
+Tests for package helper functions.
+"""
+import contextlib
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from mcpm.utils import package_helpers
+from mcpm.utils.package_helpers import run_step_command, create_package_archive, fast_rmtree, remove_package_directory
+
+
+class CreatePackageArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "requires symlink support")
+    def test_symlink_loop_is_not_followed(self):
+        source = os.path.join(self.tmp.name, "src")
+        os.makedirs(os.path.join(source, "sub"))
+        with open(os.path.join(source, "mcp_package.json"), "w") as f:
+            f.write('{"name": "demo", "version": "1.0.0"}')
+        with open(os.path.join(source, "sub", "server.py"), "w") as f:
+            f.write("print('hi')\n")
+        os.symlink("..", os.path.join(source, "sub", "loop"))
+
+        output = os.path.join(self.tmp.name, "demo.mcpz")
+        self.assertTrue(create_package_archive(output, source))
+        with zipfile.ZipFile(output) as zip_ref:
+            self.assertEqual(sorted(zip_ref.namelist()), ["mcp_package.json", "sub/server.py"])
+
+
+class RunStepCommandTest(unittest.TestCase):
+    def test_comment_is_handled_by_the_shell(self):
+        result = run_step_command("echo hi # comment", tempfile.gettempdir())
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "hi")
+
+    def test_non_executable_file_falls_back_to_the_shell(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            with open(os.path.join(cwd, "script.sh"), "w") as f:
+                f.write("echo hi\n")
+            result = run_step_command("./script.sh", cwd)
+        self.assertEqual(result.returncode, 126)
+
+    def test_script_without_shebang_runs_through_the_shell(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            script = os.path.join(cwd, "install.sh")
+            with open(script, "w") as f:
+                f.write("echo installed\n")
+            os.chmod(script, 0o755)
+            result = run_step_command("./install.sh", cwd)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout.strip(), "installed")
+
+
+@unittest.skipUnless(hasattr(os, "symlink"), "requires symlink support")
+class SymlinkedPackageDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkout = os.path.join(tmp.name, "src")
+        os.makedirs(os.path.join(self.checkout, "lib"))
+        with open(os.path.join(self.checkout, "lib", "server.py"), "w") as f:
+            f.write("print('hi')\n")
+        self.packages = os.path.join(tmp.name, "packages")
+        os.makedirs(self.packages)
+        self.link = os.path.join(self.packages, "devpkg")
+        os.symlink(self.checkout, self.link)
+
+    def assertCheckoutIntact(self):
+        self.assertTrue(os.path.isfile(os.path.join(self.checkout, "lib", "server.py")))
+
+    def test_fast_rmtree_refuses_a_symlink(self):
+        with self.assertRaises(OSError):
+            fast_rmtree(self.link)
+        self.assertTrue(os.path.islink(self.link))
+        self.assertCheckoutIntact()
+
+    def test_remove_package_directory_unlinks_only_the_link(self):
+        remove_package_directory(self.link)
+        self.assertFalse(os.path.lexists(self.link))
+        self.assertCheckoutIntact()
+
+    def test_empty_trash_skips_symlinks(self):
+        trash_link = os.path.join(self.packages, package_helpers._TRASH_PREFIX + "devpkg-0")
+        os.rename(self.link, trash_link)
+        package_helpers._empty_trash(self.packages)
+        self.assertTrue(os.path.islink(trash_link))
+        self.assertCheckoutIntact()
+
+
+class ArchiveMemberPathTest(unittest.TestCase):
+    def setUp(self):
+        self.target = os.path.join(tempfile.gettempdir(), "target")
+
+    def assertInsideTarget(self, path):
+        self.assertEqual(os.path.commonpath([self.target, path]), self.target)
+
+    def test_parent_components_are_dropped(self):
+        for name in ("../evil.txt", "a/../../evil.txt", "..\\evil.txt", "./../evil.txt"):
+            path = package_helpers._archive_member_path(self.target, name)
+            self.assertInsideTarget(path)
+            self.assertEqual(os.path.basename(path), "evil.txt")
+        self.assertEqual(package_helpers._archive_member_path(self.target, "a/../b.txt"),
+                         os.path.join(self.target, "a", "b.txt"))
+
+    def test_absolute_names_are_made_relative(self):
+        self.assertEqual(package_helpers._archive_member_path(self.target, "/etc/passwd"),
+                         os.path.join(self.target, "etc", "passwd"))
+        self.assertEqual(package_helpers._archive_member_path(self.target, "\\\\server\\share\\x.txt"),
+                         os.path.join(self.target, "server", "share", "x.txt"))
+
+    def test_drive_letters_stay_inside_target(self):
+        for name in ("C:/evil.txt", "C:\\evil.txt", "C:evil.txt"):
+            path = package_helpers._archive_member_path(self.target, name)
+            self.assertInsideTarget(path)
+            self.assertTrue(path.endswith("evil.txt"))
+
+    def test_names_without_a_path_are_skipped(self):
+        for name in ("", "/", "..", "./", "../.."):
+            self.assertIsNone(package_helpers._archive_member_path(self.target, name))
+
+    def test_directory_entries_map_to_their_directory(self):
+        self.assertEqual(package_helpers._archive_member_path(self.target, "lib/sub/"),
+                         os.path.join(self.target, "lib", "sub"))
+
+
+class ExtractPackageArchiveTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.target = os.path.join(tmp.name, "pkg")
+        self.archive = os.path.join(tmp.name, "pkg.zip")
+
+    def _extract(self):
+        with zipfile.ZipFile(self.archive) as zip_ref:
+            package_helpers._extract_package_archive(zip_ref, self.target)
+
+    def test_members_cannot_escape_the_target(self):
+        with zipfile.ZipFile(self.archive, "w") as zip_ref:
+            zip_ref.writestr("../escaped.txt", "x")
+            zip_ref.writestr("/abs.txt", "y")
+        self._extract()
+        self.assertFalse(os.path.exists(os.path.join(self.root, "escaped.txt")))
+        self.assertTrue(os.path.isfile(os.path.join(self.target, "escaped.txt")))
+        self.assertTrue(os.path.isfile(os.path.join(self.target, "abs.txt")))
+
+    def test_directory_entries_are_created(self):
+        with zipfile.ZipFile(self.archive, "w") as zip_ref:
+            zip_ref.writestr("empty/", "")
+            zip_ref.writestr("lib/server.py", "print('hi')\n")
+        self._extract()
+        self.assertTrue(os.path.isdir(os.path.join(self.target, "empty")))
+        with open(os.path.join(self.target, "lib", "server.py")) as f:
+            self.assertEqual(f.read(), "print('hi')\n")
+
+    @unittest.skipIf(os.name == "nt", "Unix permission bits")
+    def test_permission_bits_are_restored(self):
+        with zipfile.ZipFile(self.archive, "w") as zip_ref:
+            for name, mode in (("run.sh", 0o755), ("data.txt", 0o644)):
+                info = zipfile.ZipInfo(name)
+                info.external_attr = (0o100000 | mode) << 16
+                zip_ref.writestr(info, "echo hi\n")
+        self._extract()
+        self.assertEqual(os.stat(os.path.join(self.target, "run.sh")).st_mode & 0o777, 0o755)
+        self.assertEqual(os.stat(os.path.join(self.target, "data.txt")).st_mode & 0o777, 0o644)
+
+    def test_many_members_extract_on_the_pool(self):
+        names = [f"d{i % 5}/f{i}.txt" for i in range(package_helpers._PARALLEL_EXTRACT_MIN_MEMBERS + 8)]
+        with zipfile.ZipFile(self.archive, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+            for name in names:
+                zip_ref.writestr(name, name * 100)
+        with mock.patch.object(package_helpers.os, "cpu_count", return_value=4):
+            self._extract()
+        for name in names:
+            with open(os.path.join(self.target, name)) as f:
+                self.assertEqual(f.read(), name * 100)
+
+
+class GroupInstallStepsTest(unittest.TestCase):
+    def test_steps_without_a_group_run_alone(self):
+        steps = [{"command": "a"}, {"command": "b"}]
+        self.assertEqual(package_helpers._group_install_steps(steps), [[(1, steps[0])], [(2, steps[1])]])
+
+    def test_consecutive_steps_with_the_same_group_are_grouped(self):
+        steps = [
+            {"command": "a", "parallel_group": "deps"},
+            {"command": "b", "parallel_group": "deps"},
+            {"command": "c"},
+            {"command": "d", "parallel_group": "deps"},
+            {"command": "e", "parallel_group": "build"},
+        ]
+        groups = package_helpers._group_install_steps(steps)
+        self.assertEqual([[idx for idx, _ in group] for group in groups], [[1, 2], [3], [4], [5]])
+
+
+class InstallStepsTest(unittest.TestCase):
+    def test_parallel_group_output_is_reported_in_step_order(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        metadata = {
+            "name": "demo",
+            "version": "1.0.0",
+            "install_steps": [
+                # The first step finishes last, but is still reported first
+                {"type": "shell", "command": "sleep 0.3; echo first", "parallel_group": "g"},
+                {"type": "shell", "command": "echo second", "parallel_group": "g"},
+            ],
+        }
+        archive = os.path.join(tmp.name, "demo.mcpz")
+        with zipfile.ZipFile(archive, "w") as zip_ref:
+            zip_ref.writestr("mcp_package.json", json.dumps(metadata))
+
+        echoed = []
+        with mock.patch.object(package_helpers, "INSTALL_DIR", Path(tmp.name) / "packages"), \
+                mock.patch.object(package_helpers, "transaction", contextlib.nullcontext), \
+                mock.patch.object(package_helpers, "store_package_input_values"), \
+                mock.patch("click.confirm", return_value=True), \
+                mock.patch("click.echo", side_effect=lambda message="", **kwargs: echoed.append(message)):
+            success, _ = package_helpers.install_package_from_zip(archive, "demo", pending_db_rows=[])
+
+        self.assertTrue(success)
+        outputs = [message for message in echoed if str(message).startswith("Output:")]
+        self.assertEqual(outputs, ["Output:\nfirst", "Output:\nsecond"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for registry API helpers.
+"""
+import io
+import unittest
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import requests
+from urllib3.response import HTTPResponse
+
+from mcpm.registry import api
+
+
+def _response(body, content_length=None):
+    """Builds a streamed requests.Response whose body is read from body."""
+    headers = {"Content-Length": str(len(body) if content_length is None else content_length)}
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=200,
+                                preload_content=False, enforce_content_length=True)
+    return response
+
+
+class _FakeSession:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+class DownloadPackageTest(unittest.TestCase):
+    def test_downloaded_file_opens_as_zip(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_ref:
+            zip_ref.writestr("mcp_package.json", '{"name": "demo", "version": "1.0.0"}')
+
+        with mock.patch.object(api, "get_session", return_value=_FakeSession(_response(archive.getvalue()))):
+            package_file = api.download_package("demo")
+        self.assertIsNotNone(package_file)
+        try:
+            with zipfile.ZipFile(package_file) as zip_ref:
+                self.assertEqual(zip_ref.namelist(), ["mcp_package.json"])
+        finally:
+            package_file.close()
+
+    def test_truncated_download_returns_none(self):
+        response = _response(b"PK\x03\x04partial", content_length=1024)
+        with mock.patch.object(api, "get_session", return_value=_FakeSession(response)):
+            self.assertIsNone(api.download_package("demo"))
+
+
+class GetSessionTest(unittest.TestCase):
+    def test_concurrent_first_calls_share_one_session(self):
+        with mock.patch.object(api, "_session", None):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                sessions = list(executor.map(lambda _: api.get_session(), range(8)))
+        self.assertEqual(len({id(session) for session in sessions}), 1)
+        sessions[0].close()
+
+
+if __name__ == "__main__":
+    unittest.main()